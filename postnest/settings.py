@@ -48,6 +48,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'products.middleware.RolePermissionMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -64,6 +65,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'products.context_processors.role_permissions',
+                'products.context_processors.system_settings',
             ],
         },
     },
@@ -71,6 +74,10 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'postnest.wsgi.application'
 
+AUTHENTICATION_BACKENDS = [
+    'products.backends.RoleModelBackend',
+]
+
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
@@ -87,6 +94,20 @@ DATABASES = {
 }
 
 
+# Cache
+# Dashboard and catalog payloads are cached behind version keys, so every worker
+# process has to see the same cache: a version bump in one worker must reach all of
+# them. The database cache needs no extra service; its table is created by the
+# products migrations (or `manage.py createcachetable`).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'postnest_cache',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
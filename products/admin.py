@@ -1,12 +1,68 @@
+from django import forms
 from django.contrib import admin
-from .models import Category, Product, Supplier, Purchase, Stock, Role, Permission, OrderItem, Order
+from .models import Category, Product, Supplier, Purchase, Stock, Role, Permission, OrderItem, Order, StockMovement, LowStockAlert, Task
+from .services import record_movements
 
 admin.site.register(Category)
 admin.site.register(Product)
 admin.site.register(Supplier)
 admin.site.register(Purchase)
-admin.site.register(Stock)
 admin.site.register(Role)
 admin.site.register(Permission)
 admin.site.register(OrderItem)
-admin.site.register(Order)
\ No newline at end of file
+admin.site.register(Order)
+admin.site.register(LowStockAlert)
+admin.site.register(Task)
+
+
+# ---------------------------------  Stock (ledger backed)  ---------------------------------
+
+class StockAdminForm(forms.ModelForm):
+    adjustment = forms.IntegerField(
+        required=False,
+        help_text="Signed change recorded as an adjustment movement, e.g. -2 for breakage. Stock never goes below 0.",
+    )
+    adjustment_note = forms.CharField(required=False, max_length=200)
+
+    class Meta:
+        model = Stock
+        fields = ['product', 'reorder_point', 'reorder_quantity']
+
+
+@admin.register(Stock)
+class StockAdmin(admin.ModelAdmin):
+    # quantity only moves through the ledger, otherwise rebuild_stock would revert the edit
+    form = StockAdminForm
+    list_display = ['product', 'quantity', 'reorder_point', 'is_low', 'updated_at']
+    readonly_fields = ['quantity', 'is_low']
+
+    def get_readonly_fields(self, request, obj=None):
+        return self.readonly_fields + ['product'] if obj else self.readonly_fields
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            # don't write back the quantity loaded with the form, a sale may have moved it since
+            obj.save(update_fields=['reorder_point', 'reorder_quantity', 'updated_at'])
+        else:
+            obj.save()
+        adjustment = form.cleaned_data.get('adjustment')
+        if adjustment:
+            note = form.cleaned_data.get('adjustment_note') or f"Admin adjustment by {request.user}"
+            record_movements('adjustment', {obj.product_id: adjustment}, note=note, floor_at_zero=True)
+            obj.refresh_from_db()
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    # the ledger is append-only; corrections are adjustments made on the stock page
+    list_display = ['product', 'kind', 'quantity', 'purchase', 'order', 'note', 'created_at']
+    list_filter = ['kind']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,21 @@
+import time
+from django.core.cache import cache
+from django.db import transaction
+
+
+# Cached payloads embed a version number in their key; bumping the version makes
+# every older entry unreachable, so nothing has to be deleted explicitly.
+
+def get_version(key):
+    # a fresh (time based) version if the key was evicted, so old payloads are never reused
+    return cache.get_or_set(key, time.time_ns(), timeout=None)
+
+
+def _renew(key):
+    # a new unique value instead of incr(), which is not atomic on every backend (DatabaseCache)
+    cache.set(key, time.time_ns(), timeout=None)
+
+
+def bump_version(key):
+    # after commit, otherwise a concurrent reader could cache old data under the new version
+    transaction.on_commit(lambda: _renew(key))
@@ -0,0 +1,115 @@
+import json
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.expressions import RawSQL
+from .cache_versions import bump_version, get_version
+from .models import CatalogSequence, CatalogTombstone, Product
+
+CATALOG_VERSION_KEY = 'catalog:version'
+CATALOG_CACHE_TIMEOUT = 60 * 60
+
+
+def catalog_version():
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    bump_version(CATALOG_VERSION_KEY)
+
+
+def _in_stock_products(category_id):
+    products = Product.objects.filter(stock__quantity__gt=0)
+    if category_id != 'all':
+        products = products.filter(category_id=category_id)
+    # stock comes from the same joined query, no per-product lookups
+    return products.order_by('id').values('id', 'name', 'price', stock_quantity=F('stock__quantity'))
+
+
+def category_products_json(category_id):
+    """Serialized in-stock products of a category ('all' for every category), cached per catalog version."""
+    key = f'catalog:{catalog_version()}:category:{category_id}'
+    data = cache.get(key)
+    if data is None:
+        data = json.dumps([
+            {
+                'id': row['id'],
+                'name': row['name'],
+                'price': float(row['price']),
+                'stock': row['stock_quantity'],
+            }
+            for row in _in_stock_products(category_id)
+        ]).encode()
+        cache.set(key, data, CATALOG_CACHE_TIMEOUT)
+    return data
+
+
+# ---------------------------------  Delta feed  ---------------------------------
+
+def current_catalog_sequence():
+    return CatalogSequence.objects.filter(pk=1).values_list('value', flat=True).first() or 0
+
+
+def new_catalog_version():
+    """Version for catalog rows written by the current transaction."""
+    if connection.vendor == 'postgresql':
+        # the writing transaction's id: no shared row to lock, so stamping never serializes orders
+        return RawSQL('pg_current_xact_id()::text::bigint', ())
+    # other backends (SQLite) serialize write transactions, a plain counter is enough there
+    with transaction.atomic():
+        if not CatalogSequence.objects.filter(pk=1).update(value=F('value') + 1):
+            CatalogSequence.objects.create(pk=1, value=1)
+        return current_catalog_sequence()
+
+
+def catalog_watermark():
+    """Every version below this belongs to a finished transaction, so the feed can hand it out."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            # oldest transaction still running, anything stamped before it has committed or rolled back
+            cursor.execute('SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint')
+            return cursor.fetchone()[0]
+    return current_catalog_sequence() + 1
+
+
+def stamp_products(product_ids):
+    """Give the products a new catalog version so the delta feed reports them."""
+    product_ids = list(product_ids)
+    if not product_ids:
+        return
+    Product.objects.filter(pk__in=product_ids).update(catalog_version=new_catalog_version())
+    bump_catalog_version()
+
+
+def record_deleted_product(product_id):
+    CatalogTombstone.objects.create(product_id=product_id, catalog_version=new_catalog_version())
+
+
+def catalog_changes_since(since):
+    """Products changed or deleted at catalog version `since` or later; `version` is the next `since`."""
+    # read the watermark first: later commits land at or above it and come with the next call
+    version = catalog_watermark()
+    rows = (
+        Product.objects.filter(catalog_version__gte=since, catalog_version__lt=version)
+        .order_by('catalog_version', 'id')
+        .values('id', 'name', 'price', 'category_id', stock_quantity=F('stock__quantity'))
+    )
+    deleted = (
+        CatalogTombstone.objects.filter(catalog_version__gte=since, catalog_version__lt=version)
+        .order_by('catalog_version', 'id')
+        .values_list('product_id', flat=True)
+    )
+    return {
+        'version': version,
+        'products': [
+            {
+                'id': row['id'],
+                'name': row['name'],
+                'price': float(row['price']),
+                'category_id': row['category_id'],
+                'stock': row['stock_quantity'] or 0,
+            }
+            for row in rows
+        ],
+        'deleted': list(deleted),
+    }
@@ -0,0 +1,9 @@
+from .system_settings import get_system_settings
+
+
+def role_permissions(request):
+    return {'permissions_list': getattr(request, 'role_permissions', frozenset())}
+
+
+def system_settings(request):
+    return {'system_settings': get_system_settings()}
@@ -0,0 +1,83 @@
+from decimal import Decimal
+from django.core.cache import cache
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from .cache_versions import bump_version, get_version
+from .models import DailyPurchaseSummary, DailySalesSummary
+
+
+def _decimal(value):
+    return Decimal(str(value or 0))
+
+
+def dashboard_totals():
+    """All-time, this month and today purchase/sales totals, read from the daily rollups."""
+    today = timezone.localdate()
+    first_day_month = today.replace(day=1)
+    purchases = DailyPurchaseSummary.objects.aggregate(
+        all_time=Sum('total'),
+        month=Sum('total', filter=Q(day__gte=first_day_month)),
+        today=Sum('total', filter=Q(day=today)),
+    )
+    sales = DailySalesSummary.objects.aggregate(
+        all_time=Sum('total'),
+        month=Sum('total', filter=Q(day__gte=first_day_month)),
+        today=Sum('total', filter=Q(day=today)),
+    )
+    total_purchase = _decimal(purchases['all_time'])
+    total_sales = _decimal(sales['all_time'])
+    return {
+        'total_purchase': total_purchase,
+        'total_sales': total_sales,
+        'profit': total_sales - total_purchase,
+        'today_purchase': _decimal(purchases['today']),
+        'today_sales': _decimal(sales['today']),
+        'month_purchase': _decimal(purchases['month']),
+        'month_sales': _decimal(sales['month']),
+    }
+
+
+def monthly_chart():
+    """Per-month purchase and sales totals, aligned on the same list of months."""
+    purchases = dict(
+        DailyPurchaseSummary.objects.annotate(month=TruncMonth('day'))
+        .values('month')
+        .annotate(month_total=Sum('total'))
+        .values_list('month', 'month_total')
+    )
+    sales = dict(
+        DailySalesSummary.objects.annotate(month=TruncMonth('day'))
+        .values('month')
+        .annotate(month_total=Sum('total'))
+        .values_list('month', 'month_total')
+    )
+    months = sorted(set(purchases) | set(sales))
+    purchase_chart = [{'month': m.strftime('%Y-%m'), 'total': float(purchases.get(m) or 0)} for m in months]
+    sales_chart = [{'month': m.strftime('%Y-%m'), 'total': float(sales.get(m) or 0)} for m in months]
+    return purchase_chart, sales_chart
+
+
+# ---------------------------------  Versioned cache  ---------------------------------
+
+DASHBOARD_VERSION_KEY = 'dashboard:version'
+DASHBOARD_CACHE_TIMEOUT = 60 * 60
+
+
+def bump_dashboard_version():
+    bump_version(DASHBOARD_VERSION_KEY)
+
+
+def dashboard_payload():
+    """KPIs and chart series, cached per data version and local day."""
+    key = f'dashboard:{get_version(DASHBOARD_VERSION_KEY)}:{timezone.localdate().isoformat()}'
+    payload = cache.get(key)
+    if payload is None:
+        purchase_chart, sales_chart = monthly_chart()
+        payload = {
+            **dashboard_totals(),
+            'purchase_chart': purchase_chart,
+            'sales_chart': sales_chart,
+        }
+        cache.set(key, payload, DASHBOARD_CACHE_TIMEOUT)
+    return payload
@@ -25,13 +25,24 @@ def staff_or_admin_required(view_func):
     return wrapper
 
 
-# Get role permissions
-def get_role_permissions(user):
+# Role permission names cached per process: {role_id: (version, frozenset of names)}
+_role_permission_cache = {}
+
+
+def resolve_role_permissions(role):
+    if role is None:
+        return frozenset()
+    cached = _role_permission_cache.get(role.pk)
+    if cached and cached[0] == role.version:
+        return cached[1]
+    names = frozenset(role.permissions.values_list('name', flat=True))
+    _role_permission_cache[role.pk] = (role.version, names)
+    return names
+
+
+def get_user_role(user):
     user_profile = getattr(user, 'userprofile', None)
-    role = getattr(user_profile, 'role', None)
-    permissions = role.permissions.all() if role else []
-    permissions_list = list(permissions.values_list('name', flat=True))
-    return role, permissions, permissions_list
+    return getattr(user_profile, 'role', None)
 
 
 def role_permission_required(permission_name):
@@ -48,8 +59,7 @@ def role_permission_required(permission_name):
             role = getattr(user_profile, 'role', None)
             if not role:
                 return render(request, '403.html', status=403)
-            permissions = role.permissions.values_list('name', flat=True)
-            if permission_name in permissions:
+            if permission_name in resolve_role_permissions(role):
                 return view_func(request, *args, **kwargs)
             return render(request, '403.html', status=403)
         return wrapper
@@ -0,0 +1,72 @@
+import csv
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from .models import OrderItem, PurchaseItem
+
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    # csv.writer target that hands each formatted row straight back
+    def write(self, value):
+        return value
+
+
+def stream_csv(filename, header, rows):
+    writer = csv.writer(Echo())
+
+    def generate():
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(generate(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _local(value):
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S') if value else ''
+
+
+# ---------------------------------  Sales  ---------------------------------
+
+ORDER_HEADER = ['Order ID', 'Date', 'Table', 'Order Type', 'Fund', 'Discount', 'Grand Total', 'Paid Amount']
+ORDER_ITEM_HEADER = ['Order ID', 'Date', 'Table', 'Product', 'Quantity', 'Price', 'Amount']
+
+
+def order_rows(orders):
+    fields = ('id', 'created_at', 'table', 'order_type', 'fund', 'discount', 'grand_total', 'paid_amount')
+    for row in orders.order_by('id').values_list(*fields).iterator(chunk_size=CHUNK_SIZE):
+        yield (row[0], _local(row[1]), *row[2:])
+
+
+def order_item_rows(orders):
+    items = OrderItem.objects.filter(order__in=orders).order_by('order_id', 'id').values_list(
+        'order_id', 'order__created_at', 'order__table', 'product_name', 'quantity', 'price', 'amount'
+    )
+    for row in items.iterator(chunk_size=CHUNK_SIZE):
+        yield (row[0], _local(row[1]), *row[2:])
+
+
+# ---------------------------------  Purchases  ---------------------------------
+
+PURCHASE_HEADER = ['Purchase ID', 'Date', 'Supplier', 'Status', 'Total Amount', 'Created By']
+PURCHASE_ITEM_HEADER = ['Purchase ID', 'Date', 'Supplier', 'Product', 'Quantity', 'Purchase Price', 'Total']
+
+
+def purchase_rows(purchases):
+    rows = purchases.order_by('id').values_list(
+        'id', 'purchase_date', 'supplier__name', 'status', 'total_amount', 'created_by__username'
+    )
+    for row in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield (row[0], _local(row[1]), row[2], row[3], row[4], row[5] or '')
+
+
+def purchase_item_rows(purchases):
+    items = PurchaseItem.objects.filter(purchase__in=purchases).order_by('purchase_id', 'id').values_list(
+        'purchase_id', 'purchase__purchase_date', 'purchase__supplier__name',
+        'product__name', 'quantity', 'purchase_price'
+    )
+    for row in items.iterator(chunk_size=CHUNK_SIZE):
+        yield (row[0], _local(row[1]), row[2], row[3], row[4], row[5], row[4] * row[5])
@@ -1,6 +1,6 @@
 from django import forms 
 from django.contrib.auth.models import User
-from .models import Category, Product, Purchase, PurchaseItem, Supplier, Permission, Role, SystemSettings
+from .models import Category, Product, Purchase, PurchaseItem, Supplier, Permission, Role, SystemSettings, Order
 
 
 class RegisterForm(forms.ModelForm):
@@ -72,13 +72,25 @@ class PurchaseItemForm(forms.ModelForm):
 class SupplierForm(forms.ModelForm):
     class Meta:
         model = Supplier
-        fields = ['name', 'phone', 'email', 'address']
+        fields = ['name', 'phone', 'email', 'address', 'lead_time_days']
         widgets = {
             'name' : forms.TextInput(attrs={'class':'form-control'}),
             'phone': forms.TextInput(attrs={'class': 'form-control'}),
             'email': forms.EmailInput(attrs={'class': 'form-control'}),
             'address': forms.Textarea(attrs={'class': 'form-control'}),
+            'lead_time_days': forms.NumberInput(attrs={'class': 'form-control', 'min': 0}),
         }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # optional in forms and CSV imports, the model default applies when left empty
+        self.fields['lead_time_days'].required = False
+
+    def clean_lead_time_days(self):
+        lead_time_days = self.cleaned_data.get('lead_time_days')
+        if lead_time_days is None:
+            return Supplier._meta.get_field('lead_time_days').get_default()
+        return lead_time_days
     
     
 class PermissionForm(forms.ModelForm):
@@ -123,3 +135,64 @@ class SystemSettingsForm(forms.ModelForm):
         widgets = {
             'address': forms.Textarea(attrs={'rows': 3}),
         }
+
+
+class SalesReportFilterForm(forms.Form):
+    start = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}))
+    end = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}))
+    fund = forms.ChoiceField(
+        required=False,
+        choices=[('', 'All funds')] + Order._meta.get_field('fund').choices,
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    order_type = forms.ChoiceField(
+        required=False,
+        choices=[('', 'All types')] + Order._meta.get_field('order_type').choices,
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    table = forms.CharField(required=False, max_length=50, widget=forms.TextInput(attrs={'class': 'form-control'}))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start = cleaned_data.get('start')
+        end = cleaned_data.get('end')
+        if start and end and start > end:
+            raise forms.ValidationError("Start date must be before end date.")
+        return cleaned_data
+
+
+class ProductImportForm(ProductForm):
+    # category comes in by name and is resolved against a preloaded {name: Category} map
+    category = forms.CharField()
+
+    def __init__(self, *args, categories=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.categories = categories or {}
+
+    def clean_category(self):
+        name = self.cleaned_data['category'].strip()
+        category = self.categories.get(name)
+        if category is None:
+            raise forms.ValidationError(f'Unknown category "{name}".')
+        return category
+
+    def _get_validation_exclusions(self):
+        # the category is already known to exist, skip the per-row EXISTS query of model validation
+        exclude = super()._get_validation_exclusions()
+        exclude.add('category')
+        return exclude
+
+
+class CatalogImportForm(forms.Form):
+    kind = forms.ChoiceField(
+        choices=[('category', 'Categories'), ('product', 'Products'), ('supplier', 'Suppliers')],
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    file = forms.FileField(widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv'}))
+
+
+class InvoiceImportForm(PurchaseForm):
+    file = forms.FileField(
+        help_text="CSV or JSON with product (id or name), quantity and purchase_price.",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.json'}),
+    )
@@ -0,0 +1,170 @@
+import csv
+import json
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from .catalog import bump_catalog_version, stamp_products
+from .forms import CategoryForm, ProductImportForm, SupplierForm
+from .models import Category, Product, PurchaseItem
+from .services import collect_purchase_lines
+
+BATCH_SIZE = 1000
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []  # [(csv line number, message)]
+        self.file_error = None  # the file could not be read, nothing was imported
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+
+def _category_map():
+    # one query; with duplicate names the oldest category wins
+    categories = {}
+    for category in Category.objects.only('id', 'name').order_by('-id'):
+        categories[category.name.strip()] = category
+    return categories
+
+
+def _flush(kind, batch, result):
+    with transaction.atomic():
+        created = type(batch[0]).objects.bulk_create(batch, batch_size=len(batch))
+        if kind == 'product':
+            # bulk_create skips post_save, so stamp them for the POS delta feed here
+            stamp_products(obj.pk for obj in created)
+    result.created += len(created)
+
+
+def import_rows(kind, lines, batch_size=BATCH_SIZE):
+    """Validate CSV `lines` row by row with the model forms and insert the valid rows in batches.
+
+    Invalid rows are reported in the result and skipped; the rest of the file is still imported.
+    `lines` must be seekable: it is read once up front so an undecodable file imports nothing.
+    """
+    result = ImportResult()
+    try:
+        # a bad byte near the end would otherwise surface after earlier batches were committed
+        for _ in csv.reader(lines):
+            pass
+        lines.seek(0)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        result.file_error = f"Cannot read file: {exc}. Save it as a UTF-8 CSV."
+        return result
+    if kind == 'product':
+        categories = _category_map()
+
+        def build_form(row):
+            return ProductImportForm(row, categories=categories)
+    else:
+        form_class = CategoryForm if kind == 'category' else SupplierForm
+
+        def build_form(row):
+            return form_class(row)
+
+    reader = csv.DictReader(lines)
+    batch = []
+    for row in reader:
+        form = build_form({key.strip(): (value or '').strip() for key, value in row.items() if key})
+        if not form.is_valid():
+            message = '; '.join(
+                f"{field}: {' '.join(errors)}" if field != '__all__' else ' '.join(errors)
+                for field, errors in form.errors.items()
+            )
+            result.errors.append((reader.line_num, message))
+            continue
+        batch.append(form.save(commit=False))
+        if len(batch) >= batch_size:
+            _flush(kind, batch, result)
+            batch = []
+    if batch:
+        _flush(kind, batch, result)
+    if kind == 'category' and result.created:
+        bump_catalog_version()
+    return result
+
+
+# ---------------------------------  Supplier invoices  ---------------------------------
+
+def _invoice_rows(stream, filename):
+    if filename.lower().endswith('.json'):
+        data = json.load(stream)
+        if isinstance(data, dict):
+            data = data.get('items', [])
+        if not isinstance(data, list):
+            raise ValueError("JSON invoice must be a list of items or an object with an \"items\" list.")
+        return [(number, row) for number, row in enumerate(data, start=1)]
+    reader = csv.DictReader(stream)
+    return [(reader.line_num, row) for row in reader]
+
+
+def _resolve_products(refs):
+    # invoice lines name a product by id or by exact name; both are looked up in one query each
+    ids = {int(ref) for ref in refs if ref.isdigit()}
+    names = {ref for ref in refs if not ref.isdigit()}
+    resolved = {str(pk): pk for pk in Product.objects.filter(pk__in=ids).values_list('id', flat=True)}
+    for name, pk in Product.objects.filter(name__in=names).order_by('-id').values_list('name', 'id'):
+        resolved[name] = pk
+    return resolved
+
+
+def parse_invoice(stream, filename):
+    """Read invoice lines (product, quantity, purchase_price) from a CSV or JSON file.
+
+    Returns ({product_id: [quantity, price]}, errors); the invoice should only be saved without errors.
+    """
+    try:
+        rows = _invoice_rows(stream, filename)
+    except (ValueError, csv.Error) as exc:
+        return {}, [(0, f"Cannot read invoice: {exc}")]
+
+    # JSON entries that aren't objects are line errors, so an invoice is imported whole or not at all
+    errors = [(number, "line is not an object with product, quantity and purchase_price")
+              for number, row in rows if not isinstance(row, dict)]
+    rows = [
+        (number, {str(key).strip(): str(value if value is not None else '').strip() for key, value in row.items() if key})
+        for number, row in rows if isinstance(row, dict)
+    ]
+    products = _resolve_products({row.get('product', '') for number, row in rows} - {''})
+    quantity_field = PurchaseItem._meta.get_field('quantity')
+    price_field = PurchaseItem._meta.get_field('purchase_price')
+    product_ids, quantities, prices = [], [], []
+    first_price = {}  # product_id: (price, line number) of its first line
+    for number, row in rows:
+        problems = []
+        product_id = products.get(row.get('product', ''))
+        if product_id is None:
+            problems.append(f'unknown product "{row.get("product", "")}"')
+        # the same limits the purchase item columns enforce (range, digits, decimal places)
+        try:
+            quantity = quantity_field.clean(row.get('quantity', ''), None)
+        except ValidationError:
+            problems.append(f'invalid quantity "{row.get("quantity", "")}"')
+        try:
+            price = price_field.clean(row.get('purchase_price', ''), None)
+            if price < 0:
+                raise ValidationError('negative')
+        except ValidationError:
+            problems.append(f'invalid purchase_price "{row.get("purchase_price", "")}"')
+        if not problems and product_id in first_price and first_price[product_id][0] != price:
+            # repeated lines are merged into one item, which can only carry one price
+            earlier_price, earlier_number = first_price[product_id]
+            problems.append(f'purchase_price {price} conflicts with {earlier_price} on line {earlier_number}')
+        if problems:
+            errors.append((number, '; '.join(problems)))
+            continue
+        first_price.setdefault(product_id, (price, number))
+        product_ids.append(product_id)
+        quantities.append(quantity)
+        prices.append(price)
+    if not rows and not errors:
+        errors.append((0, "The invoice has no lines."))
+    lines = collect_purchase_lines(product_ids, quantities, prices)
+    for product_id, (quantity, price) in lines.items():
+        try:
+            quantity_field.clean(quantity, None)
+        except ValidationError:
+            errors.append((first_price[product_id][1], f'total quantity {quantity} is too large'))
+    return lines, sorted(errors)
@@ -0,0 +1,71 @@
+import hashlib
+import os
+from io import BytesIO
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+LOGO_VARIANT_DIR = 'logos/variants'
+
+# name: (max width, max height, grayscale)
+LOGO_VARIANTS = {
+    'receipt': (384, 160, True),     # 58mm thermal printer, 384 dots wide
+    'navbar': (240, 48, False),
+    'navbar_2x': (480, 96, False),   # retina navbar
+    'preview': (300, 300, False),    # settings page
+}
+
+
+def _render_variant(image, width, height, grayscale):
+    variant = image.copy()
+    variant.thumbnail((width, height), Image.LANCZOS)
+    if grayscale:
+        # flatten transparency onto white, printers have no alpha
+        background = Image.new('RGBA', variant.size, (255, 255, 255, 255))
+        variant = Image.alpha_composite(background, variant).convert('L')
+    buffer = BytesIO()
+    variant.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def build_logo_variants(logo):
+    """Write the fixed-size variants of an uploaded logo, return {name: storage path}."""
+    logo.open('rb')
+    try:
+        image = ImageOps.exif_transpose(Image.open(logo)).convert('RGBA')
+    finally:
+        logo.close()
+
+    variants = {}
+    for name, (width, height, grayscale) in LOGO_VARIANTS.items():
+        data = _render_variant(image, width, height, grayscale)
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        path = f'{LOGO_VARIANT_DIR}/{name}-{digest}.png'
+        if not default_storage.exists(path):
+            path = default_storage.save(path, ContentFile(data))
+        variants[name] = path
+    return variants
+
+
+def delete_logo_variants(variants):
+    for path in (variants or {}).values():
+        if default_storage.exists(path):
+            default_storage.delete(path)
+
+
+def refresh_logo_variants(settings_instance):
+    """Regenerate the variants after the logo changed (or was removed) and drop the old files."""
+    old_variants = settings_instance.logo_variants or {}
+    new_variants = build_logo_variants(settings_instance.logo) if settings_instance.logo else {}
+    delete_logo_variants({
+        name: path for name, path in old_variants.items() if path not in new_variants.values()
+    })
+    settings_instance.logo_variants = new_variants
+    settings_instance.save(update_fields=['logo_variants'])
+
+
+def variant_path(filename):
+    # only plain file names inside the variant directory can be served
+    if os.path.basename(filename) != filename or not filename.endswith('.png'):
+        return None
+    return f'{LOGO_VARIANT_DIR}/{filename}'
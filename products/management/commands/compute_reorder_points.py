@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from products.reorder import COVER_DAYS, SAFETY_DAYS, VELOCITY_DAYS, compute_reorder_points
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute per-product reorder points and suggested order quantities from recent sales "
+        "velocity and supplier lead time. Meant to run nightly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=VELOCITY_DAYS, help="Days of sales history to measure.")
+        parser.add_argument('--safety-days', type=int, default=SAFETY_DAYS)
+        parser.add_argument('--cover-days', type=int, default=COVER_DAYS, help="Days a suggested order should last.")
+
+    def handle(self, *args, **options):
+        changed = compute_reorder_points(
+            days=max(options['days'], 1),
+            safety_days=options['safety_days'],
+            cover_days=options['cover_days'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Updated reorder points of {changed} product(s)."))
@@ -0,0 +1,49 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from products.models import Order, Permission, Purchase, Role
+from products.reorder import low_stock_products
+from products.rollups import day_bounds
+
+
+def hot_queries():
+    # the same querysets the views run, keyed by where they come from
+    month_start, _ = day_bounds(timezone.localdate().replace(day=1))
+    purchase = Purchase.objects.order_by('-id').first()
+    return [
+        ('sales_report_list', Order.objects.filter(status='completed').order_by('-created_at', '-id')[:51]),
+        ('sales_report_list (range)', Order.objects.filter(status='completed', created_at__gte=month_start)
+            .order_by('-created_at', '-id')[:51]),
+        ('save_order pending check', Order.objects.filter(table='1', status='pending')),
+        ('low_stock_list', low_stock_products().order_by('id')),
+        ('purchase rollup refresh', Purchase.objects.filter(
+            supplier_id=purchase.supplier_id if purchase else 0, purchase_date__gte=month_start)),
+        ('purchase by date', Purchase.objects.filter(purchase_date__gte=month_start)),
+        ('role by name', Role.objects.filter(name='superuser')),
+        ('permission by name', Permission.objects.filter(name='product_list')),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the query plan and timing of the hot list/lookup queries. "
+        "Captured SQLite plans from before and after `migrate products 0016` are in docs/hot_query_plans.md."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help="Use EXPLAIN ANALYZE (PostgreSQL only).")
+        parser.add_argument('--repeat', type=int, default=20, help="Executions per query for the timing.")
+
+    def handle(self, *args, **options):
+        explain_options = {'analyze': True} if options['analyze'] and connection.vendor == 'postgresql' else {}
+        for label, queryset in hot_queries():
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(queryset.explain(**explain_options))
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(f"median {statistics.median(timings):.3f} ms over {len(timings)} runs\n")
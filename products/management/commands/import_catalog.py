@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from products.importers import BATCH_SIZE, import_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk import categories, products or suppliers from a CSV file with a header row."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=['category', 'product', 'supplier'])
+        parser.add_argument('path', help="CSV file; products reference their category by name.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as lines:
+                result = import_rows(options['kind'], lines, batch_size=options['batch_size'])
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+        if result.file_error:
+            raise CommandError(f"{options['path']}: {result.file_error}")
+        for line, message in result.errors:
+            self.stderr.write(f"line {line}: {message}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} {options['kind']} row(s), {result.failed} row(s) skipped."
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from products.importers import parse_invoice
+from products.models import Purchase, Supplier
+from products.services import save_new_purchase
+
+
+class Command(BaseCommand):
+    help = "Create a purchase, its items and the stock movements from a supplier invoice (CSV or JSON)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Invoice lines: product (id or name), quantity, purchase_price.")
+        parser.add_argument('--supplier', type=int, required=True, help="Supplier id.")
+        parser.add_argument(
+            '--status', default='Received', choices=[value for value, label in Purchase._meta.get_field('status').choices],
+        )
+
+    def handle(self, *args, **options):
+        supplier = Supplier.objects.filter(pk=options['supplier']).first()
+        if supplier is None:
+            raise CommandError(f"Supplier #{options['supplier']} does not exist.")
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as stream:
+                lines, errors = parse_invoice(stream, options['path'])
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+        if errors:
+            for line, message in errors:
+                self.stderr.write(f"line {line}: {message}")
+            raise CommandError(f"Invoice not imported, {len(errors)} invalid line(s).")
+
+        purchase = save_new_purchase(Purchase(supplier=supplier, status=options['status']), lines)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created purchase #{purchase.pk} with {len(lines)} product(s), total {purchase.total_amount}."
+        ))
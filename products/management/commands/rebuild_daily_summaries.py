@@ -0,0 +1,25 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from products.rollups import rebuild_daily_summaries
+
+
+class Command(BaseCommand):
+    help = "Backfill or rebuild the daily sales and purchase rollup tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since', metavar='YYYY-MM-DD',
+            help="Only rebuild days from this date onwards (default: all history).",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError("--since must be a date in YYYY-MM-DD format.")
+        sales, purchases = rebuild_daily_summaries(since)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt rollups: {sales} daily sales row(s), {purchases} daily purchase row(s)."
+        ))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from products.models import Stock, StockMovement
+from products.services import sync_low_stock_flags
+
+
+class Command(BaseCommand):
+    help = "Rebuild Stock.quantity snapshots from the stock movement ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help="Only report products whose snapshot differs from the ledger.",
+        )
+
+    def handle(self, *args, **options):
+        ledger = dict(
+            StockMovement.objects.values('product_id')
+            .annotate(total=Sum('quantity'))
+            .values_list('product_id', 'total')
+        )
+        with transaction.atomic():
+            drifted = []
+            for stock in Stock.objects.select_for_update().only('id', 'product_id', 'quantity', 'reorder_point', 'is_low'):
+                expected = ledger.get(stock.product_id) or 0
+                if stock.quantity != expected:
+                    self.stdout.write(f"product #{stock.product_id}: snapshot {stock.quantity}, ledger {expected}")
+                    stock.quantity = expected
+                    stock.updated_at = timezone.now()
+                    drifted.append(stock)
+
+            if options['check']:
+                self.stdout.write(f"{len(drifted)} stock snapshot(s) out of date.")
+                return
+            Stock.objects.bulk_update(drifted, ['quantity', 'updated_at'], batch_size=1000)
+            sync_low_stock_flags(drifted)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(drifted)} stock snapshot(s)."))
@@ -0,0 +1,41 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from products.task_queue import KEEP_DONE_DAYS, prune_done_tasks, run_next_task
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks. Start one or more of these next to the web server."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run every due task, then exit.")
+        parser.add_argument('--sleep', type=float, default=2.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--keep-days', type=int, default=KEEP_DONE_DAYS,
+                            help="Delete finished tasks older than this many days (checked hourly).")
+
+    def handle(self, *args, **options):
+        next_prune = timezone.now()
+        try:
+            while True:
+                if timezone.now() >= next_prune:
+                    pruned = prune_done_tasks(options['keep_days'])
+                    if pruned:
+                        self.stdout.write(f"Pruned {pruned} finished tasks.")
+                    next_prune = timezone.now() + timedelta(hours=1)
+                task_row = run_next_task()
+                if task_row is None:
+                    if options['once']:
+                        return
+                    time.sleep(options['sleep'])
+                    continue
+                line = f"{task_row.name} #{task_row.pk}: {task_row.status} (attempt {task_row.attempts})"
+                if task_row.status == 'done':
+                    self.stdout.write(self.style.SUCCESS(line))
+                elif task_row.status == 'failed':
+                    self.stderr.write(self.style.ERROR(line))
+                    self.stderr.write(task_row.last_error)
+                else:
+                    self.stderr.write(self.style.WARNING(f"{line}, retry at {timezone.localtime(task_row.run_after):%H:%M:%S}"))
+        except KeyboardInterrupt:
+            self.stdout.write("Worker stopped.")
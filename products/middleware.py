@@ -0,0 +1,15 @@
+from .decorators import get_user_role, resolve_role_permissions
+
+
+class RolePermissionMiddleware:
+    # resolve the user's permission names once per request (request.role_permissions)
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user = request.user
+        if user.is_authenticated:
+            request.role_permissions = resolve_role_permissions(get_user_role(user))
+        else:
+            request.role_permissions = frozenset()
+        return self.get_response(request)
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_stockmovement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='role',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
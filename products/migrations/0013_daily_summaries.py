@@ -0,0 +1,71 @@
+# Generated by Django 6.0 on 2026-10-18 16:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def fill_summaries(apps, schema_editor):
+    # same aggregation as rollups.rebuild_daily_summaries, so the dashboards are right on deploy
+    Order = apps.get_model('products', 'Order')
+    Purchase = apps.get_model('products', 'Purchase')
+    DailySalesSummary = apps.get_model('products', 'DailySalesSummary')
+    DailyPurchaseSummary = apps.get_model('products', 'DailyPurchaseSummary')
+    sales_rows = (
+        Order.objects.filter(status='completed')
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'fund', 'order_type')
+        .annotate(order_count=Count('id'), total=Sum('grand_total'))
+        .order_by()
+    )
+    purchase_rows = (
+        Purchase.objects.annotate(day=TruncDate('purchase_date'))
+        .values('day', 'supplier_id')
+        .annotate(purchase_count=Count('id'), total=Sum('total_amount'))
+        .order_by()
+    )
+    DailySalesSummary.objects.bulk_create(
+        [DailySalesSummary(**row) for row in sales_rows.iterator()], batch_size=1000
+    )
+    DailyPurchaseSummary.objects.bulk_create(
+        [DailyPurchaseSummary(**row) for row in purchase_rows.iterator()], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_role_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('fund', models.CharField(max_length=20)),
+                ('order_type', models.CharField(max_length=20)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('total', models.FloatField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'fund', 'order_type'), name='unique_daily_sales_bucket')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyPurchaseSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('purchase_count', models.PositiveIntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_purchases', to='products.supplier')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'supplier'), name='unique_daily_purchase_bucket')],
+            },
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-18 16:23
+
+from django.db import migrations, models
+
+
+def stamp_existing_products(apps, schema_editor):
+    # start the feed at version 1 so a terminal syncing from 0 receives every product
+    CatalogSequence = apps.get_model('products', 'CatalogSequence')
+    Product = apps.get_model('products', 'Product')
+    CatalogSequence.objects.create(pk=1, value=1)
+    Product.objects.update(catalog_version=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0013_daily_summaries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='catalog_version',
+            field=models.BigIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(stamp_existing_products, migrations.RunPython.noop),
+    ]
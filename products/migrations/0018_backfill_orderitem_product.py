@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-18 16:31
+
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def link_order_items(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    OrderItem = apps.get_model('products', 'OrderItem')
+    # exact name match; with duplicate names the oldest product wins
+    product_ids = {}
+    for product_id, name in Product.objects.order_by('-id').values_list('id', 'name').iterator(chunk_size=BATCH_SIZE):
+        product_ids[name] = product_id
+
+    last_id = 0
+    while True:
+        # walk the unlinked items by id, every batch is its own short UPDATE
+        rows = list(
+            OrderItem.objects.filter(product__isnull=True, id__gt=last_id)
+            .order_by('id')
+            .values_list('id', 'product_name')[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+        last_id = rows[-1][0]
+        matched = [
+            OrderItem(id=item_id, product_id=product_ids[name])
+            for item_id, name in rows if name in product_ids
+        ]
+        OrderItem.objects.bulk_update(matched, ['product'])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('products', '0017_orderitem_product'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_order_items, migrations.RunPython.noop),
+    ]
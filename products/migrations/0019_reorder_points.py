@@ -0,0 +1,37 @@
+# Generated by Django 6.0 on 2026-10-18 16:34
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0018_backfill_orderitem_product'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='stock',
+            name='stock_low_quantity_idx',
+        ),
+        migrations.AddField(
+            model_name='stock',
+            name='reorder_point',
+            field=models.PositiveIntegerField(default=8),
+        ),
+        migrations.AddField(
+            model_name='stock',
+            name='reorder_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='supplier',
+            name='lead_time_days',
+            field=models.PositiveIntegerField(default=7),
+        ),
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(django.db.models.expressions.CombinedExpression(models.F('quantity'), '-', models.F('reorder_point')), name='stock_reorder_gap_idx'),
+        ),
+    ]
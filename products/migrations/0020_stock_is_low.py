@@ -0,0 +1,53 @@
+# Generated by Django 6.0 on 2026-10-18 16:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def flag_low_stocks(apps, schema_editor):
+    Stock = apps.get_model('products', 'Stock')
+    Stock.objects.filter(quantity__lt=models.F('reorder_point')).update(is_low=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0019_reorder_points'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LowStockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('low', 'Below reorder point'), ('restocked', 'Back above reorder point')], max_length=20)),
+                ('quantity', models.IntegerField()),
+                ('reorder_point', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='stock',
+            name='stock_reorder_gap_idx',
+        ),
+        migrations.AddField(
+            model_name='stock',
+            name='is_low',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(flag_low_stocks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(condition=models.Q(('is_low', True)), fields=['product'], name='stock_is_low_idx'),
+        ),
+        migrations.AddField(
+            model_name='lowstockalert',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_alerts', to='products.product'),
+        ),
+        migrations.AddIndex(
+            model_name='lowstockalert',
+            index=models.Index(condition=models.Q(('sent_at__isnull', True)), fields=['id'], name='lowstockalert_unsent_idx'),
+        ),
+    ]
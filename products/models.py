@@ -1,6 +1,10 @@
+import os
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
+from django.urls import reverse
+from django.db.models import F, Q, Sum
+from django.utils import timezone
 
 # Create your models here.
 
@@ -23,16 +27,36 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    catalog_version = models.BigIntegerField(default=0, db_index=True)  # see catalog.new_catalog_version()
 
     def __str__(self):
         return self.name
 
 
+class CatalogSequence(models.Model):
+    # single row counter for the catalog feed on databases without transaction ids (SQLite)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return str(self.value)
+
+
+class CatalogTombstone(models.Model):
+    # deleted products, reported by the catalog feed so clients can drop them
+    product_id = models.BigIntegerField()
+    catalog_version = models.BigIntegerField(db_index=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Product #{self.product_id} deleted"
+
+
 class Supplier(models.Model):
     name = models.CharField(max_length=150)
     phone = models.CharField(max_length=20)
     email = models.EmailField(blank=True)
     address = models.TextField(blank=True)
+    lead_time_days = models.PositiveIntegerField(default=7)  # order to delivery, used for reorder points
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -53,13 +77,24 @@ class Purchase(models.Model):
         ],
         default='Received'
     )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['purchase_date'], name='purchase_date_idx'),
+            # daily purchase rollup refresh: one supplier, one day range
+            models.Index(fields=['supplier', 'purchase_date'], name='purchase_supplier_date_idx'),
+        ]
+
     @property
     def total(self):
         return sum(item.total() for item in self.items.all())
 
     def update_total_amount(self):
-        self.total_amount = self.total
-        self.save()
+        # one aggregate over the items, written back without re-saving the whole header
+        self.total_amount = self.items.aggregate(
+            total=Sum(F('quantity') * F('purchase_price'), output_field=models.DecimalField(max_digits=12, decimal_places=2))
+        )['total'] or 0
+        Purchase.objects.filter(pk=self.pk).update(total_amount=self.total_amount)
 
 
 class PurchaseItem(models.Model):
@@ -80,8 +115,19 @@ class PurchaseItem(models.Model):
 class Stock(models.Model):
     product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name='stock')
     quantity = models.IntegerField(default=0)
+    # recomputed from sales velocity by the compute_reorder_points job, see products.reorder
+    reorder_point = models.PositiveIntegerField(default=8)
+    reorder_quantity = models.PositiveIntegerField(default=0)
+    # quantity < reorder_point, flipped by services.sync_low_stock_flags when a movement crosses it
+    is_low = models.BooleanField(default=False)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # low stock list and badges only ever read the few flagged rows
+            models.Index(fields=['product'], condition=Q(is_low=True), name='stock_is_low_idx'),
+        ]
+
     def __str__(self):
         return f"{self.product.name} - {self.quantity}"
 
@@ -89,7 +135,7 @@ class Stock(models.Model):
 
 # -------------------------------   Permission    ---------------------------------------
 class Permission(models.Model):
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, db_index=True)
     group = models.CharField(max_length=100)
     
     def __str__(self):
@@ -97,9 +143,20 @@ class Permission(models.Model):
     
     
 class Role(models.Model):
-    name = models.CharField(max_length=100)
+    name = models.CharField(max_length=100, db_index=True)
     permissions = models.ManyToManyField(Permission, blank=True)
-    
+    version = models.PositiveIntegerField(default=0)  # bumped whenever the permission set changes
+
+    def save(self, *args, **kwargs):
+        # version only moves through the F() bumps in products.signals; writing back the value
+        # loaded with this instance could undo a concurrent bump
+        if not self._state.adding:
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = [field.name for field in self._meta.concrete_fields if not field.primary_key]
+            kwargs['update_fields'] = [name for name in update_fields if name != 'version']
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
     
@@ -122,9 +179,17 @@ class SystemSettings(models.Model):
     token_or_table = models.CharField(max_length=100)
     payment_type = models.CharField(max_length=100)
     website = models.CharField(max_length=100)
-    
+    logo_variants = models.JSONField(default=dict, blank=True, editable=False)  # {name: storage path}, see products.logos
+
     def __str__(self):
         return self.company_name
+
+    @property
+    def logo_urls(self):
+        return {
+            name: reverse('logo_variant', args=[os.path.basename(path)])
+            for name, path in (self.logo_variants or {}).items()
+        }
     
 
 
@@ -138,9 +203,126 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=20, default='pending')  # pending / completed
 
+    class Meta:
+        indexes = [
+            # sales report: status='completed' ordered/ranged by (created_at, id)
+            models.Index(fields=['status', 'created_at', 'id'], name='order_status_created_idx'),
+            # "table already has a pending order" check on every new order
+            models.Index(fields=['table'], condition=Q(status='pending'), name='order_pending_table_idx'),
+        ]
+
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
+    # product_name stays as the name at the time of sale; the FK is what analytics group by
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, blank=True, related_name='order_items')
     product_name = models.CharField(max_length=100)
     quantity = models.IntegerField()
     price = models.FloatField()
-    amount = models.FloatField()
\ No newline at end of file
+    amount = models.FloatField()
+
+
+class StockMovement(models.Model):
+    KIND_CHOICES = [
+        ('purchase', 'Purchase'),
+        ('sale', 'Sale'),
+        ('reversal', 'Reversal'),
+        ('adjustment', 'Adjustment'),
+    ]
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_movements')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    quantity = models.IntegerField()  # signed: + stock in / - stock out
+    purchase = models.ForeignKey(Purchase, on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements')
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements')
+    note = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def save(self, *args, **kwargs):
+        # ledger is append-only, corrections are new movements
+        if self.pk:
+            raise ValueError("Stock movements cannot be changed once recorded.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.product} {self.kind} {self.quantity:+d}"
+
+
+class LowStockAlert(models.Model):
+    # outbox: one row per threshold crossing, sent_at is set once the notification went out
+    KIND_CHOICES = [
+        ('low', 'Below reorder point'),
+        ('restocked', 'Back above reorder point'),
+    ]
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='low_stock_alerts')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    quantity = models.IntegerField()
+    reorder_point = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], condition=Q(sent_at__isnull=True), name='lowstockalert_unsent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product} {self.kind} ({self.quantity}/{self.reorder_point})"
+
+
+# -------------------------------   Daily rollups    ---------------------------------------
+class DailySalesSummary(models.Model):
+    day = models.DateField()
+    fund = models.CharField(max_length=20)
+    order_type = models.CharField(max_length=20)
+    order_count = models.PositiveIntegerField(default=0)
+    total = models.FloatField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'fund', 'order_type'], name='unique_daily_sales_bucket'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.fund}/{self.order_type}: {self.total}"
+
+
+class DailyPurchaseSummary(models.Model):
+    day = models.DateField()
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name='daily_purchases')
+    purchase_count = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'supplier'], name='unique_daily_purchase_bucket'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.supplier}: {self.total}"
+
+
+# -------------------------------   Background tasks    ---------------------------------------
+class Task(models.Model):
+    # rows are claimed by the run_tasks worker, see products.task_queue
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    name = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # the worker only ever looks at due pending tasks, oldest first
+            models.Index(fields=['run_after', 'id'], condition=Q(status='pending'), name='task_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,114 @@
+import base64
+import json
+from django.db.models import Q
+
+PER_PAGE = 50
+
+
+class KeysetPage:
+    def __init__(self, object_list, params, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self._params = params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def _query(self, key, cursor):
+        params = self._params.copy()
+        params.pop('after', None)
+        params.pop('before', None)
+        params[key] = cursor
+        return '?' + params.urlencode()
+
+    @property
+    def next_query(self):
+        return self._query('after', self.next_cursor)
+
+    @property
+    def previous_query(self):
+        return self._query('before', self.previous_cursor)
+
+
+# ---------------------------------  cursor helpers  ---------------------------------
+
+def _json_default(value):
+    # full precision isoformat, DjangoJSONEncoder would truncate microseconds
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def _encode_cursor(values):
+    raw = json.dumps(values, default=_json_default).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_cursor(cursor, model, fields):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if len(values) != len(fields):
+            return None
+        return [model._meta.get_field(name).to_python(value) for name, value in zip(fields, values)]
+    except Exception:
+        return None
+
+
+def _seek(fields, descending, values, forward):
+    # (a, b) < (x, y)  ==  a < x OR (a = x AND b < y), spelled per column so mixed directions work
+    condition = Q()
+    for i, name in enumerate(fields):
+        older = descending[i] == forward
+        step = Q(**{f'{name}__{"lt" if older else "gt"}': values[i]})
+        for prev_name, prev_value in zip(fields[:i], values[:i]):
+            step &= Q(**{prev_name: prev_value})
+        condition |= step
+    return condition
+
+
+def keyset_paginate(request, queryset, ordering=('-id',), per_page=PER_PAGE):
+    """Slice `queryset` by the cursor in ?after= / ?before= without OFFSET or COUNT(*)."""
+    fields = [field.lstrip('-') for field in ordering]
+    descending = [field.startswith('-') for field in ordering]
+    reverse_ordering = [name if desc else f'-{name}' for name, desc in zip(fields, descending)]
+
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    forward = not before
+    cursor = _decode_cursor(after or before, queryset.model, fields) if (after or before) else None
+
+    if cursor is None:
+        forward = True
+        qs = queryset.order_by(*ordering)
+    elif forward:
+        qs = queryset.filter(_seek(fields, descending, cursor, True)).order_by(*ordering)
+    else:
+        qs = queryset.filter(_seek(fields, descending, cursor, False)).order_by(*reverse_ordering)
+
+    rows = list(qs[:per_page + 1])
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    def key(obj):
+        return _encode_cursor([getattr(obj, name) for name in fields])
+
+    next_cursor = previous_cursor = None
+    if rows:
+        if (has_more if forward else cursor is not None):
+            next_cursor = key(rows[-1])
+        if (cursor is not None if forward else has_more):
+            previous_cursor = key(rows[0])
+    return KeysetPage(rows, request.GET, next_cursor, previous_cursor)
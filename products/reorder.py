@@ -0,0 +1,71 @@
+import math
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Sum
+from django.utils import timezone
+from .models import OrderItem, Product, PurchaseItem, Stock
+from .rollups import day_bounds
+from .services import sync_low_stock_flags
+
+BATCH_SIZE = 1000
+VELOCITY_DAYS = 30      # sales history the velocity is measured over
+SAFETY_DAYS = 3         # extra days of demand kept on hand on top of the lead time
+COVER_DAYS = 30         # a suggested order should last this long
+DEFAULT_LEAD_TIME_DAYS = 7
+
+
+def low_stock_products():
+    # the flagged stock rows come from the stock_is_low_idx partial index, products by primary key
+    return Product.objects.filter(pk__in=Stock.objects.filter(is_low=True).values('product_id'))
+
+
+def suggested_order_quantity(stock):
+    # back up to the reorder point, plus one cover period (at least one unit)
+    return max(stock.reorder_point - stock.quantity, 0) + max(stock.reorder_quantity, 1)
+
+
+def compute_reorder_points(days=VELOCITY_DAYS, safety_days=SAFETY_DAYS, cover_days=COVER_DAYS):
+    """Recompute every Stock.reorder_point/reorder_quantity from recent sales and supplier lead time."""
+    start, _ = day_bounds(timezone.localdate() - timedelta(days=days - 1))
+    sold = dict(
+        OrderItem.objects.filter(
+            order__status='completed', order__created_at__gte=start, product__isnull=False,
+        )
+        .values('product_id')
+        .annotate(units=Sum('quantity'))
+        .values_list('product_id', 'units')
+    )
+    # lead time of the supplier the product was last bought from
+    last_lead_time = (
+        PurchaseItem.objects.filter(product_id=OuterRef('product_id'))
+        .order_by('-purchase__purchase_date', '-id')
+        .values('purchase__supplier__lead_time_days')[:1]
+    )
+    stocks = Stock.objects.annotate(lead_time=Subquery(last_lead_time)).only(
+        'id', 'product_id', 'reorder_point', 'reorder_quantity',
+    )
+
+    computed = {}
+    for stock in stocks.iterator(chunk_size=2000):
+        per_day = (sold.get(stock.product_id) or 0) / days
+        lead_time = stock.lead_time if stock.lead_time is not None else DEFAULT_LEAD_TIME_DAYS
+        # never 0, so a product that is out of stock still shows up as low
+        reorder_point = max(math.ceil(per_day * (lead_time + safety_days)), 1)
+        reorder_quantity = math.ceil(per_day * cover_days)
+        if (stock.reorder_point, stock.reorder_quantity) != (reorder_point, reorder_quantity):
+            computed[stock.product_id] = (reorder_point, reorder_quantity)
+
+    product_ids = sorted(computed)
+    for i in range(0, len(product_ids), BATCH_SIZE):
+        with transaction.atomic():
+            # lock like the stock ledger does, so the low flag is judged against the current quantity
+            locked = list(
+                Stock.objects.select_for_update()
+                .filter(product_id__in=product_ids[i:i + BATCH_SIZE])
+                .order_by('product_id')
+            )
+            for stock in locked:
+                stock.reorder_point, stock.reorder_quantity = computed[stock.product_id]
+            Stock.objects.bulk_update(locked, ['reorder_point', 'reorder_quantity'])
+            sync_low_stock_flags(locked)
+    return len(computed)
@@ -0,0 +1,187 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import Count, F, FloatField, Func, Sum, Window
+from django.db.models.expressions import RowRange
+from django.db.models.functions import Rank, TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .cache_versions import get_version
+from .dashboard import DASHBOARD_VERSION_KEY
+from .forms import SalesReportFilterForm
+from .models import DailySalesSummary, Order, OrderItem
+from .rollups import day_bounds
+
+
+def default_report_start(end=None):
+    # without a start date the report covers the month of `end` (or the current month)
+    return (end or timezone.localdate()).replace(day=1)
+
+
+def filtered_sales(params):
+    """Completed orders narrowed by the report filters; returns (form, queryset)."""
+    data = params.copy()
+    if not data.get('start'):
+        try:
+            end = parse_date(data.get('end') or '')
+        except ValueError:
+            end = None
+        data['start'] = default_report_start(end).isoformat()
+    form = SalesReportFilterForm(data)
+    orders = Order.objects.filter(status='completed')
+    if not form.is_valid():
+        return form, orders.filter(created_at__gte=day_bounds(default_report_start())[0])
+    data = form.cleaned_data
+    # half-open [start 00:00, day after end 00:00) ranges keep created_at usable by an index
+    orders = orders.filter(created_at__gte=day_bounds(data['start'])[0])
+    if data['end']:
+        orders = orders.filter(created_at__lt=day_bounds(data['end'])[1])
+    if data['fund']:
+        orders = orders.filter(fund=data['fund'])
+    if data['order_type']:
+        orders = orders.filter(order_type=data['order_type'])
+    if data['table']:
+        orders = orders.filter(table=data['table'])
+    return form, orders
+
+
+def _summary_breakdown(data):
+    # date, fund and order type filters are all dimensions of the daily rollup
+    summaries = DailySalesSummary.objects.filter(day__gte=data['start'])
+    if data['end']:
+        summaries = summaries.filter(day__lte=data['end'])
+    if data['fund']:
+        summaries = summaries.filter(fund=data['fund'])
+    if data['order_type']:
+        summaries = summaries.filter(order_type=data['order_type'])
+    totals = {'orders': Sum('order_count'), 'amount': Sum('total')}
+    daily = summaries.values('day').annotate(**totals).order_by('-day')
+    by_fund = summaries.values('fund').annotate(**totals).order_by('fund')
+    return (
+        [{'day': row['day'], 'order_count': row['orders'], 'total': row['amount']} for row in daily],
+        [{'fund': row['fund'], 'order_count': row['orders'], 'total': row['amount']} for row in by_fund],
+    )
+
+
+def sales_breakdown(form, orders):
+    """(daily, by_fund) subtotals of the filtered report, from the rollup unless a table is filtered."""
+    if form.is_valid() and not form.cleaned_data['table']:
+        return _summary_breakdown(form.cleaned_data)
+    daily = (
+        orders.annotate(day=TruncDate('created_at'))
+        .values('day')
+        .annotate(order_count=Count('id'), total=Sum('grand_total'))
+        .order_by('-day')
+    )
+    by_fund = (
+        orders.values('fund')
+        .annotate(order_count=Count('id'), total=Sum('grand_total'))
+        .order_by('fund')
+    )
+    return list(daily), list(by_fund)
+
+
+# ---------------------------------  Top sellers / velocity  ---------------------------------
+
+VELOCITY_WINDOWS = {'today': 1, '7': 7, '30': 30, '90': 90}  # window -> days, today included
+VELOCITY_TOP_N = 10
+VELOCITY_CACHE_TIMEOUT = 60 * 60
+
+
+class _SumOver(Func):
+    # SUM(<aggregate>) usable as a window expression
+    function = 'SUM'
+    window_compatible = True
+    output_field = FloatField()
+
+
+class _AvgOver(Func):
+    function = 'AVG'
+    window_compatible = True
+    output_field = FloatField()
+
+
+def _sold_items(start):
+    return OrderItem.objects.filter(
+        order__status='completed', order__created_at__gte=start, product__isnull=False
+    )
+
+
+def _top_products(start, days, metric):
+    rows = (
+        _sold_items(start)
+        .values('product_id', name=F('product__name'))
+        .annotate(units=Sum('quantity'), revenue=Sum('amount'))
+        .annotate(
+            # window expressions go in their own annotate() so they stay out of the GROUP BY
+            rank=Window(Rank(), order_by=Sum(metric).desc()),
+            all_revenue=Window(_SumOver(Sum('amount'))),
+        )
+        .order_by('rank', 'product_id')[:VELOCITY_TOP_N]
+    )
+    return [
+        {
+            'rank': row['rank'],
+            'product_id': row['product_id'],
+            'name': row['name'],
+            'quantity': row['units'],
+            'revenue': round(row['revenue'], 2),
+            'revenue_share': round(100 * row['revenue'] / row['all_revenue'], 1) if row['all_revenue'] else 0,
+            'per_day': round(row['units'] / days, 2),
+        }
+        for row in rows
+    ]
+
+
+def _daily_series(start, product_ids):
+    # moving average over each product's last 7 selling days, computed by the database
+    rows = (
+        _sold_items(start)
+        .filter(product_id__in=product_ids)
+        .annotate(day=TruncDate('order__created_at'))
+        .values('product_id', 'day')
+        .annotate(units=Sum('quantity'))
+        .annotate(
+            moving_avg=Window(
+                _AvgOver(Sum('quantity')),
+                partition_by=[F('product_id')],
+                order_by=F('day').asc(),
+                frame=RowRange(start=-6, end=0),
+            ),
+        )
+        .order_by('product_id', 'day')
+    )
+    series = {}
+    for row in rows:
+        series.setdefault(row['product_id'], []).append({
+            'day': row['day'].isoformat(),
+            'quantity': row['units'],
+            'moving_avg': round(row['moving_avg'], 2),
+        })
+    return series
+
+
+def velocity_report(window):
+    """Top products by quantity and revenue over `window`, cached per window, day and sales version."""
+    days = VELOCITY_WINDOWS[window]
+    today = timezone.localdate()
+    # completing an order bumps the dashboard version, which retires every cached window at once
+    key = f'velocity:{get_version(DASHBOARD_VERSION_KEY)}:{window}:{today.isoformat()}'
+    report = cache.get(key)
+    if report is None:
+        start_day = today - timedelta(days=days - 1)
+        start, _ = day_bounds(start_day)
+        by_quantity = _top_products(start, days, 'quantity')
+        by_revenue = _top_products(start, days, 'amount')
+        daily = _daily_series(start, {row['product_id'] for row in by_quantity + by_revenue})
+        for row in by_quantity + by_revenue:
+            row['moving_avg'] = daily[row['product_id']][-1]['moving_avg']
+        report = {
+            'window': window,
+            'start': start_day.isoformat(),
+            'end': today.isoformat(),
+            'by_quantity': by_quantity,
+            'by_revenue': by_revenue,
+            'daily': daily,
+        }
+        cache.set(key, report, VELOCITY_CACHE_TIMEOUT)
+    return report
@@ -0,0 +1,90 @@
+from datetime import datetime, time, timedelta
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .dashboard import bump_dashboard_version
+from .models import DailyPurchaseSummary, DailySalesSummary, Order, Purchase
+
+
+def day_bounds(day):
+    # [local midnight, next local midnight) of `day`
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min), tz)
+
+
+# ---------------------------------  Incremental updates  ---------------------------------
+
+def add_order_to_daily_sales(order):
+    day = timezone.localdate(order.created_at)
+    summary, _ = DailySalesSummary.objects.get_or_create(day=day, fund=order.fund, order_type=order.order_type)
+    DailySalesSummary.objects.filter(pk=summary.pk).update(
+        order_count=F('order_count') + 1,
+        total=F('total') + float(order.grand_total or 0),
+    )
+    bump_dashboard_version()
+
+
+def refresh_daily_purchases(day, supplier_id):
+    # purchases can be edited or deleted, so the (day, supplier) bucket is re-aggregated; the bucket
+    # row is locked first so two purchases committing together can't overwrite each other's totals
+    with transaction.atomic():
+        summary, _ = DailyPurchaseSummary.objects.get_or_create(day=day, supplier_id=supplier_id)
+        summary = DailyPurchaseSummary.objects.select_for_update().get(pk=summary.pk)
+        start, end = day_bounds(day)
+        totals = Purchase.objects.filter(
+            supplier_id=supplier_id, purchase_date__gte=start, purchase_date__lt=end
+        ).aggregate(purchase_count=Count('id'), total=Sum('total_amount'))
+        # an emptied bucket stays at zero: deleting it would break a request waiting on its lock
+        summary.purchase_count = totals['purchase_count']
+        summary.total = totals['total'] or 0
+        summary.save(update_fields=['purchase_count', 'total'])
+
+
+def refresh_purchase_rollup(purchase, old_supplier_id=None):
+    day = timezone.localdate(purchase.purchase_date)
+    refresh_daily_purchases(day, purchase.supplier_id)
+    if old_supplier_id and old_supplier_id != purchase.supplier_id:
+        refresh_daily_purchases(day, old_supplier_id)
+    bump_dashboard_version()
+
+
+# ---------------------------------  Backfill  ---------------------------------
+
+def rebuild_daily_summaries(since=None):
+    """Recreate both rollup tables from the raw orders and purchases (from `since` onwards)."""
+    orders = Order.objects.filter(status='completed')
+    purchases = Purchase.objects.all()
+    sales_summaries = DailySalesSummary.objects.all()
+    purchase_summaries = DailyPurchaseSummary.objects.all()
+    if since:
+        start, _ = day_bounds(since)
+        orders = orders.filter(created_at__gte=start)
+        purchases = purchases.filter(purchase_date__gte=start)
+        sales_summaries = sales_summaries.filter(day__gte=since)
+        purchase_summaries = purchase_summaries.filter(day__gte=since)
+
+    sales_rows = (
+        orders.annotate(day=TruncDate('created_at'))
+        .values('day', 'fund', 'order_type')
+        .annotate(order_count=Count('id'), total=Sum('grand_total'))
+        .order_by()
+    )
+    purchase_rows = (
+        purchases.annotate(day=TruncDate('purchase_date'))
+        .values('day', 'supplier_id')
+        .annotate(purchase_count=Count('id'), total=Sum('total_amount'))
+        .order_by()
+    )
+    with transaction.atomic():
+        sales_summaries.delete()
+        purchase_summaries.delete()
+        DailySalesSummary.objects.bulk_create(
+            [DailySalesSummary(**row) for row in sales_rows.iterator()], batch_size=1000
+        )
+        DailyPurchaseSummary.objects.bulk_create(
+            [DailyPurchaseSummary(**row) for row in purchase_rows.iterator()], batch_size=1000
+        )
+        bump_dashboard_version()
+    return DailySalesSummary.objects.count(), DailyPurchaseSummary.objects.count()
@@ -0,0 +1,277 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+from .catalog import stamp_products
+from .rollups import refresh_purchase_rollup
+from .models import LowStockAlert, Order, OrderItem, PurchaseItem, Stock, StockMovement
+
+
+class OrderRejected(Exception):
+    # the message is shown to the cashier as is
+    pass
+
+
+class InsufficientStock(OrderRejected):
+    def __init__(self, product_name):
+        super().__init__(f"{product_name} not available.")
+        self.product_name = product_name
+
+
+class InvalidQuantity(OrderRejected):
+    def __init__(self, quantity):
+        super().__init__(f"Invalid quantity \"{quantity}\", quantities must be whole numbers of at least 1.")
+        self.quantity = quantity
+
+
+class TableBusy(OrderRejected):
+    def __init__(self, table):
+        super().__init__(f"Table {table} already has a pending order!")
+        self.table = table
+
+
+# ---------------------------------  Stock ledger  ---------------------------------
+
+def _quantity_case(quantities):
+    # one CASE expression so every stock row is changed by a single UPDATE
+    return Case(
+        *[When(product_id=product_id, then=Value(qty)) for product_id, qty in quantities.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _lock_stocks(product_ids, create_missing=False):
+    # lock the stock rows in one statement, always in the same order
+    def select(ids):
+        return {
+            stock.product_id: stock
+            for stock in Stock.objects.select_for_update(of=('self',))
+            .select_related('product')
+            .filter(product_id__in=ids)
+            .order_by('product_id')
+        }
+
+    stocks = select(product_ids)
+    missing = set(product_ids) - set(stocks)
+    if missing and create_missing:
+        Stock.objects.bulk_create(
+            [Stock(product_id=product_id, quantity=0) for product_id in missing],
+            ignore_conflicts=True,
+        )
+        stocks.update(select(missing))
+    return stocks
+
+
+def sync_low_stock_flags(stocks):
+    """Flip Stock.is_low on locked `stocks` whose quantity crossed the reorder point, one alert per crossing."""
+    crossed = [stock for stock in stocks if (stock.quantity < stock.reorder_point) != stock.is_low]
+    if not crossed:
+        return []
+    for stock in crossed:
+        stock.is_low = not stock.is_low
+    for is_low in (True, False):
+        ids = [stock.pk for stock in crossed if stock.is_low == is_low]
+        if ids:
+            Stock.objects.filter(pk__in=ids).update(is_low=is_low)
+    return LowStockAlert.objects.bulk_create([
+        LowStockAlert(
+            product_id=stock.product_id,
+            kind='low' if stock.is_low else 'restocked',
+            quantity=stock.quantity,
+            reorder_point=stock.reorder_point,
+        )
+        for stock in crossed
+    ])
+
+
+def _apply_movements(stocks, kind, deltas, purchase=None, order=None, note=''):
+    # append the ledger rows, then move the Stock snapshots by the same amounts;
+    # returns the low stock alerts the movements caused
+    deltas = {product_id: qty for product_id, qty in deltas.items() if qty}
+    if not deltas:
+        return []
+    StockMovement.objects.bulk_create([
+        StockMovement(
+            product_id=product_id,
+            kind=kind,
+            quantity=qty,
+            purchase=purchase,
+            order=order,
+            note=note,
+        )
+        for product_id, qty in deltas.items()
+    ])
+    Stock.objects.filter(product_id__in=deltas).update(
+        quantity=F('quantity') + _quantity_case(deltas),
+        updated_at=timezone.now(),
+    )
+    for product_id, qty in deltas.items():
+        stocks[product_id].quantity += qty
+    alerts = sync_low_stock_flags([stocks[product_id] for product_id in deltas])
+    stamp_products(deltas)
+    return alerts
+
+
+def record_movements(kind, deltas, purchase=None, order=None, note='', floor_at_zero=False):
+    """Record signed stock changes ({product_id: qty}) and update the snapshots; returns the alerts raised."""
+    deltas = {product_id: qty for product_id, qty in deltas.items() if qty}
+    if not deltas:
+        return []
+    with transaction.atomic():
+        stocks = _lock_stocks(deltas, create_missing=True)
+        if floor_at_zero:
+            deltas = {
+                product_id: max(qty, -stocks[product_id].quantity)
+                for product_id, qty in deltas.items()
+            }
+        return _apply_movements(stocks, kind, deltas, purchase=purchase, order=order, note=note)
+
+
+# ---------------------------------  Purchase items  ---------------------------------
+
+def collect_purchase_lines(product_ids, quantities, prices):
+    # {product_id: [quantity, price]}, repeated products are merged and keep their first price
+    lines = {}
+    for prod_id, qty, price in zip(product_ids, quantities, prices):
+        if not prod_id or not qty or int(qty) <= 0:
+            continue
+        line = lines.setdefault(int(prod_id), [0, Decimal(str(price or 0))])
+        line[0] += int(qty)
+    return lines
+
+
+def save_new_purchase(purchase, lines):
+    """Save an unsaved purchase with its `lines`; items, stock and total are each written once."""
+    with transaction.atomic():
+        purchase.save()
+        PurchaseItem.objects.bulk_create([
+            PurchaseItem(purchase=purchase, product_id=product_id, quantity=quantity, purchase_price=price)
+            for product_id, (quantity, price) in lines.items()
+        ], batch_size=1000)
+        if purchase.status == 'Received':
+            record_movements(
+                'purchase',
+                {product_id: quantity for product_id, (quantity, price) in lines.items()},
+                purchase=purchase,
+            )
+        purchase.update_total_amount()
+        refresh_purchase_rollup(purchase)
+    return purchase
+
+
+def sync_purchase_items(purchase, lines, old_status):
+    """Bring the purchase's items and stock in line with `lines`, touching only what changed."""
+    with transaction.atomic():
+        existing = {}
+        to_delete = []
+        old_received = defaultdict(int)
+        for item in purchase.items.select_for_update().order_by('id'):
+            old_received[item.product_id] += item.quantity
+            if item.product_id in existing or item.product_id not in lines:
+                to_delete.append(item.pk)
+            else:
+                existing[item.product_id] = item
+
+        to_create = []
+        to_update = []
+        for product_id, (quantity, price) in lines.items():
+            item = existing.get(product_id)
+            if item is None:
+                to_create.append(PurchaseItem(
+                    purchase=purchase, product_id=product_id, quantity=quantity, purchase_price=price
+                ))
+            elif item.quantity != quantity or item.purchase_price != price:
+                item.quantity = quantity
+                item.purchase_price = price
+                to_update.append(item)
+
+        if to_delete:
+            PurchaseItem.objects.filter(pk__in=to_delete).delete()
+        if to_update:
+            PurchaseItem.objects.bulk_update(to_update, ['quantity', 'purchase_price'])
+        if to_create:
+            PurchaseItem.objects.bulk_create(to_create)
+
+        # stock only moves by the difference between what was and what is now received
+        if old_status != 'Received':
+            old_received = {}
+        new_received = {
+            product_id: quantity for product_id, (quantity, price) in lines.items()
+        } if purchase.status == 'Received' else {}
+        deltas = {
+            product_id: new_received.get(product_id, 0) - old_received.get(product_id, 0)
+            for product_id in set(old_received) | set(new_received)
+        }
+        record_movements(
+            'purchase', {product_id: qty for product_id, qty in deltas.items() if qty > 0},
+            purchase=purchase,
+        )
+        record_movements(
+            'reversal', {product_id: qty for product_id, qty in deltas.items() if qty < 0},
+            purchase=purchase, note=f"Purchase #{purchase.id} updated", floor_at_zero=True,
+        )
+        purchase.update_total_amount()
+
+
+# ---------------------------------  Stock reservation  ---------------------------------
+
+def _lock_table(table):
+    # held until commit; SQLite has no row locks but only ever runs one write transaction
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [f'order-table:{table}'])
+
+
+def _order_quantity(value):
+    # the order page posts integers; digit strings are accepted, fractions and negatives are not
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise InvalidQuantity(value)
+    return value
+
+
+def place_order(items, **order_fields):
+    lines = [
+        (int(item['product_id']), _order_quantity(item['quantity']), float(item['price']))
+        for item in items
+    ]
+    wanted = defaultdict(int)
+    for product_id, quantity, price in lines:
+        wanted[product_id] += quantity
+
+    with transaction.atomic():
+        # one pending order per table, checked under a lock so two terminals can't both pass
+        table = order_fields.get('table')
+        _lock_table(table)
+        if Order.objects.filter(table=table, status='pending').exists():
+            raise TableBusy(table)
+
+        stocks = _lock_stocks(wanted)
+        for product_id, quantity in wanted.items():
+            stock = stocks.get(product_id)
+            if stock is None:
+                raise InsufficientStock(f"Product #{product_id}")
+            if stock.quantity < quantity:
+                raise InsufficientStock(stock.product.name)
+
+        order = Order.objects.create(**order_fields)
+        order.low_stock_alerts = _apply_movements(
+            stocks, 'sale',
+            {product_id: -quantity for product_id, quantity in wanted.items()},
+            order=order,
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product_id=product_id,
+                product_name=stocks[product_id].product.name,
+                quantity=quantity,
+                price=price,
+                amount=quantity * price,
+            )
+            for product_id, quantity, price in lines
+        ])
+    return order
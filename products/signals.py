@@ -0,0 +1,79 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .catalog import bump_catalog_version, record_deleted_product, stamp_products
+from .models import Category, Permission, Product, Role, Stock, SystemSettings
+from .services import sync_low_stock_flags
+from .system_settings import invalidate_system_settings
+
+
+# ---------------------------------  Role permission versions  ---------------------------------
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+def bump_role_version(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # permission.role_set changed: pk_set holds role ids, a clear affects every linked role
+        if action == 'pre_clear':
+            Role.objects.filter(permissions=instance).update(version=F('version') + 1)
+        elif action in ('post_add', 'post_remove') and pk_set:
+            Role.objects.filter(pk__in=pk_set).update(version=F('version') + 1)
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        Role.objects.filter(pk=instance.pk).update(version=F('version') + 1)
+
+
+@receiver(post_save, sender=Permission)
+def bump_roles_on_permission_rename(sender, instance, created, **kwargs):
+    if not created:
+        Role.objects.filter(permissions=instance).update(version=F('version') + 1)
+
+
+@receiver(pre_delete, sender=Permission)
+def bump_roles_on_permission_delete(sender, instance, **kwargs):
+    Role.objects.filter(permissions=instance).update(version=F('version') + 1)
+
+
+# ---------------------------------  Catalog version  ---------------------------------
+
+@receiver(post_save, sender=Product)
+def stamp_saved_product(sender, instance, **kwargs):
+    stamp_products([instance.pk])
+
+
+@receiver(post_save, sender=Stock)
+def stamp_stock_product(sender, instance, **kwargs):
+    stamp_products([instance.product_id])
+
+
+@receiver(post_delete, sender=Product)
+def record_product_tombstone(sender, instance, **kwargs):
+    record_deleted_product(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Stock)
+def bump_catalog_version_on_change(sender, **kwargs):
+    bump_catalog_version()
+
+
+# ---------------------------------  Low stock flag  ---------------------------------
+
+@receiver(post_save, sender=Stock)
+def sync_saved_stock_low_flag(sender, instance, raw=False, **kwargs):
+    # direct saves (admin, scripts) flip the flag and record the alert like ledger movements do
+    if raw:
+        return
+    with transaction.atomic():
+        stock = Stock.objects.select_for_update().only('product_id', 'quantity', 'reorder_point', 'is_low').get(pk=instance.pk)
+        sync_low_stock_flags([stock])
+    instance.is_low = stock.is_low
+
+
+# ---------------------------------  System settings  ---------------------------------
+
+@receiver(post_save, sender=SystemSettings)
+@receiver(post_delete, sender=SystemSettings)
+def reset_system_settings(sender, **kwargs):
+    invalidate_system_settings()
@@ -0,0 +1,45 @@
+import hashlib
+import time
+from .cache_versions import bump_version, get_version
+from .models import SystemSettings
+
+SYSTEM_SETTINGS_VERSION_KEY = 'system_settings:version'
+
+# a local copy is also reloaded after this many seconds, in case a version bump never reaches
+# this process (e.g. CACHES switched to a per-process backend)
+SYSTEM_SETTINGS_TIMEOUT = 5 * 60
+
+# (version, loaded at, SystemSettings or None, fingerprint) held in process memory
+_cached = None
+
+
+def _fingerprint(obj):
+    # same row content gives the same value in every process
+    values = [getattr(obj, field.attname) for field in obj._meta.concrete_fields] if obj else []
+    return hashlib.sha256(repr(values).encode()).hexdigest()[:16]
+
+
+def _load():
+    global _cached
+    version = get_version(SYSTEM_SETTINGS_VERSION_KEY)
+    now = time.monotonic()
+    if _cached is None or _cached[0] != version or now - _cached[1] > SYSTEM_SETTINGS_TIMEOUT:
+        obj = SystemSettings.objects.first()
+        _cached = (version, now, obj, _fingerprint(obj))
+    return _cached
+
+
+def system_settings_version():
+    """Identifies the content get_system_settings() currently serves, for ETags."""
+    return _load()[3]
+
+
+def get_system_settings():
+    """The single SystemSettings row (or None), reloaded on a version bump or after SYSTEM_SETTINGS_TIMEOUT."""
+    return _load()[2]
+
+
+def invalidate_system_settings():
+    global _cached
+    _cached = None
+    bump_version(SYSTEM_SETTINGS_VERSION_KEY)
@@ -0,0 +1,79 @@
+import traceback
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from .models import Task
+
+BACKOFF_SECONDS = 30        # first retry delay, doubled on every further attempt
+MAX_BACKOFF_SECONDS = 60 * 60
+KEEP_DONE_DAYS = 7          # finished tasks are deleted after this, failed ones are kept
+
+_registry = {}
+
+
+def task(func):
+    """Register `func` as a background task, run by the run_tasks worker with its payload as kwargs."""
+    name = f'{func.__module__}.{func.__name__}'
+    _registry[name] = func
+    func.task_name = name
+    return func
+
+
+def enqueue(func, delay=0, max_attempts=5, **payload):
+    # inside a transaction the row only becomes visible to the worker on commit
+    return Task.objects.create(
+        name=func.task_name,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def _backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS))
+
+
+def run_next_task():
+    """Claim and run the oldest due task; returns it, or None if nothing is due.
+
+    The claim is a FOR UPDATE SKIP LOCKED row lock held until the task finishes, so several
+    workers never pick the same task, and a worker that dies leaves the task pending.
+    """
+    with transaction.atomic():
+        task_row = (
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', run_after__lte=timezone.now())
+            .order_by('run_after', 'id')
+            .first()
+        )
+        if task_row is None:
+            return None
+
+        task_row.attempts += 1
+        func = _registry.get(task_row.name)
+        try:
+            if func is None:
+                raise LookupError(f'Unknown task "{task_row.name}".')
+            # its own savepoint: a failing task rolls back its writes but keeps the attempt
+            with transaction.atomic():
+                func(**task_row.payload)
+        except Exception:
+            task_row.last_error = traceback.format_exc()
+            if func is None or task_row.attempts >= task_row.max_attempts:
+                task_row.status = 'failed'
+                task_row.finished_at = timezone.now()
+            else:
+                task_row.run_after = timezone.now() + _backoff(task_row.attempts)
+        else:
+            task_row.status = 'done'
+            task_row.last_error = ''
+            task_row.finished_at = timezone.now()
+        task_row.save(update_fields=['attempts', 'status', 'run_after', 'last_error', 'finished_at'])
+    return task_row
+
+
+def prune_done_tasks(days=KEEP_DONE_DAYS):
+    """Delete tasks that finished successfully more than `days` ago; returns how many."""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Task.objects.filter(status='done', finished_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,26 @@
+from django.core.mail import mail_admins
+from django.utils import timezone
+from .models import LowStockAlert
+from .task_queue import task
+
+
+@task
+def deliver_low_stock_alerts():
+    # a concurrent run skips the alerts this one is sending
+    alerts = list(
+        LowStockAlert.objects.select_for_update(skip_locked=True, of=('self',))
+        .filter(sent_at__isnull=True)
+        .select_related('product')
+        .order_by('id')[:500]
+    )
+    if not alerts:
+        return
+    mail_admins(
+        f"{len(alerts)} stock level change(s)",
+        "\n".join(
+            f"{alert.product.name}: {alert.get_kind_display().lower()} "
+            f"({alert.quantity} in stock, reorder point {alert.reorder_point})"
+            for alert in alerts
+        ),
+    )
+    LowStockAlert.objects.filter(pk__in=[alert.pk for alert in alerts]).update(sent_at=timezone.now())
@@ -1,3 +1,121 @@
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.test import TestCase
+from .models import Category, Order, Permission, Product, Purchase, Role, Stock, StockMovement, Supplier
+from .services import InsufficientStock, InvalidQuantity, TableBusy, place_order, save_new_purchase, sync_purchase_items
 
-# Create your tests here.
+
+class StockLedgerTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Drinks')
+        self.product = Product.objects.create(name='Cola', category=category, price=10)
+        self.supplier = Supplier.objects.create(name='Acme', phone='123')
+
+    def receive(self, quantity, status='Received'):
+        purchase = Purchase(supplier=self.supplier, status=status)
+        save_new_purchase(purchase, {self.product.id: [quantity, 1]})
+        return purchase
+
+    def order(self, quantity):
+        return place_order(
+            [{'product_id': self.product.id, 'quantity': quantity, 'price': 10}],
+            table='1', order_type='parcel', fund='cash', grand_total=0,
+        )
+
+    def stock_quantity(self):
+        return Stock.objects.get(product=self.product).quantity
+
+    def test_oversell_is_rejected_without_side_effects(self):
+        self.receive(5)
+        with self.assertRaises(InsufficientStock):
+            self.order(6)
+        self.assertEqual(self.stock_quantity(), 5)
+        self.assertFalse(Order.objects.exists())
+
+        self.order(5)
+        self.assertEqual(self.stock_quantity(), 0)
+
+    def test_non_positive_quantities_are_rejected(self):
+        self.receive(5)
+        for quantity in (0, -2, '1.5', 1.5, 'two'):
+            with self.assertRaises(InvalidQuantity):
+                self.order(quantity)
+        self.assertEqual(self.stock_quantity(), 5)
+        self.assertFalse(Order.objects.exists())
+
+    def test_table_with_pending_order_is_busy(self):
+        self.receive(5)
+        self.order(1)
+        with self.assertRaises(TableBusy):
+            self.order(1)
+        self.assertEqual(self.stock_quantity(), 4)
+
+    def test_purchase_edit_applies_only_the_delta(self):
+        purchase = self.receive(10)
+        self.order(3)
+
+        sync_purchase_items(purchase, {self.product.id: [12, 1]}, 'Received')
+        self.assertEqual(self.stock_quantity(), 9)
+        sync_purchase_items(purchase, {self.product.id: [12, 1]}, 'Received')
+        self.assertEqual(self.stock_quantity(), 9)
+
+        purchase.status = 'Pending'
+        purchase.save()
+        sync_purchase_items(purchase, {self.product.id: [12, 1]}, 'Received')
+        self.assertEqual(self.stock_quantity(), 0)  # floored at zero, 3 were already sold
+
+    def test_pending_purchase_does_not_move_stock(self):
+        purchase = self.receive(4, status='Pending')
+        self.assertFalse(StockMovement.objects.exists())
+
+        purchase.status = 'Received'
+        purchase.save()
+        sync_purchase_items(purchase, {self.product.id: [4, 1]}, 'Pending')
+        self.assertEqual(self.stock_quantity(), 4)
+
+    def test_rebuild_check_reports_drift_and_rebuild_fixes_it(self):
+        self.receive(7)
+        Stock.objects.filter(product=self.product).update(quantity=50)
+
+        out = StringIO()
+        call_command('rebuild_stock', '--check', stdout=out)
+        self.assertIn(f"product #{self.product.id}: snapshot 50, ledger 7", out.getvalue())
+        self.assertEqual(self.stock_quantity(), 50)
+
+        call_command('rebuild_stock', stdout=StringIO())
+        self.assertEqual(self.stock_quantity(), 7)
+
+        out = StringIO()
+        call_command('rebuild_stock', '--check', stdout=out)
+        self.assertIn("0 stock snapshot(s) out of date.", out.getvalue())
+
+    def test_admin_adjustment_goes_through_the_ledger(self):
+        self.receive(5)
+        stock = Stock.objects.get(product=self.product)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+
+        response = self.client.post(f'/admin/products/stock/{stock.pk}/change/', {
+            'reorder_point': 8, 'reorder_quantity': 0, 'quantity': 999,
+            'adjustment': -2, 'adjustment_note': 'broken bottles',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.stock_quantity(), 3)
+        movement = StockMovement.objects.get(kind='adjustment')
+        self.assertEqual((movement.quantity, movement.note), (-2, 'broken bottles'))
+
+        out = StringIO()
+        call_command('rebuild_stock', '--check', stdout=out)
+        self.assertIn("0 stock snapshot(s) out of date.", out.getvalue())
+
+
+class RoleVersionTests(TestCase):
+    def test_saving_a_stale_role_keeps_concurrent_version_bumps(self):
+        role = Role.objects.create(name='cashier')
+        stale = Role.objects.get(pk=role.pk)
+        role.permissions.add(Permission.objects.create(name='order_create', group='orders'))
+
+        stale.name = 'counter'
+        stale.save()
+        role.refresh_from_db()
+        self.assertEqual((role.name, role.version), ('counter', 1))
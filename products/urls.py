@@ -18,10 +18,14 @@ urlpatterns = [
     
     path('purchase/create/', views.create_purchase, name='purchase_create'),
     path('purchase/list/', views.purchase_list, name='purchase_list'),
+    path('purchase/import/', views.purchase_import, name='purchase_import'),
+    path('purchase/export/', views.purchase_export, name='purchase_export'),
     path('purchase/detail/<int:pk>/', views.purchase_detail, name='purchase_detail'),
     path('purchase/<int:pk>/update/', views.purchase_update, name='purchase_update'),
     path('purchase/<int:pk>/delete', views.purchase_delete, name='purchase_delete'),
     
+    path('import/', views.catalog_import, name='catalog_import'),
+
     path('supplier/create/', views.supplier_create, name='supplier_create'),
     path('supplier/list/', views.supplier_list, name='supplier_list'),
     path('supplier/<int:pk>/edit/', views.supplier_update, name='supplier_update'),
@@ -43,6 +47,7 @@ urlpatterns = [
     path('system/list/', views.system_list, name='system_list'),
     path('system/', views.company_create, name='system'),
     path('system/<int:pk>/update/', views.system_update, name='system_update'),  
+    path('system/logo/<str:filename>', views.logo_variant, name='logo_variant'),
     
     path('stock/list/', views.low_stock_list, name='stock_list'),
     
@@ -53,6 +58,7 @@ urlpatterns = [
     path('orders/category/<int:category_id>/', views.order_list, name='order_list_by_category'),
     
     path('product/orders/ajax/products/<str:category_id>/', views.ajax_products_by_category, name='ajax_products'),
+    path('catalog/changes/', views.catalog_changes, name='catalog_changes'),
     
     path('orders/save/', views.save_order, name='save_order'),
     
@@ -61,6 +67,9 @@ urlpatterns = [
     path('order/accept/<int:order_id>/', views.accept_order, name='accept_order'),
 
     path('sales/report/', views.sales_report_list, name='sales_report'),
+    path('sales/report/export/', views.sales_report_export, name='sales_report_export'),
+    path('sales/top/', views.top_sellers_report, name='top_sellers'),
+    path('sales/top.json', views.top_sellers_json, name='top_sellers_json'),
     
     path('dashboard/', views.admin_dashboard, name='admin_dashboard'),
 
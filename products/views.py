@@ -1,19 +1,36 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from . models import Category, Product, Purchase, Stock, Supplier, Permission, Role, UserProfile, SystemSettings, Order, OrderItem
-from . forms import CategoryForm, ProductForm, PurchaseForm, PurchaseItem, SupplierForm, PermissionForm, RoleForm, SystemSettingsForm
+from . models import Category, Product, Purchase, Supplier, Permission, Role, UserProfile, SystemSettings, Order
+from . forms import CategoryForm, ProductForm, PurchaseForm, PurchaseItem, SupplierForm, PermissionForm, RoleForm, SystemSettingsForm, CatalogImportForm, InvoiceImportForm
 from collections import defaultdict
-from .decorators import get_role_permissions
 from django.contrib import messages
+from django.views.decorators.http import condition
 from django.contrib.auth.models import User
-from .decorators import admin_required, staff_or_admin_required, get_role_permissions, role_permission_required
-from django.http import JsonResponse
+from .decorators import admin_required, staff_or_admin_required, get_user_role, role_permission_required
+from .catalog import catalog_changes_since, catalog_version, category_products_json
+from .dashboard import dashboard_payload
+from .exports import (
+    ORDER_HEADER, ORDER_ITEM_HEADER, PURCHASE_HEADER, PURCHASE_ITEM_HEADER,
+    order_item_rows, order_rows, purchase_item_rows, purchase_rows, stream_csv,
+)
+from .importers import import_rows, parse_invoice
+from .logos import refresh_logo_variants, variant_path
+from .pagination import keyset_paginate
+from .reorder import low_stock_products, suggested_order_quantity
+from .reports import VELOCITY_WINDOWS, filtered_sales, sales_breakdown, velocity_report
+from .rollups import add_order_to_daily_sales, refresh_purchase_rollup
+from .system_settings import get_system_settings, system_settings_version
+from .task_queue import enqueue
+from .tasks import deliver_low_stock_alerts
+from .services import OrderRejected, collect_purchase_lines, place_order, record_movements, save_new_purchase, sync_purchase_items
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.core.files.storage import default_storage
+import hashlib
+import io
 import json
 from django.db.models import Sum
-from django.db.models.functions import TruncMonth
-from decimal import Decimal
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.db import transaction
+from django.utils import timezone
 
 # --------------------------------  Category Create  -----------------------------------------------------------------
 
@@ -31,8 +48,7 @@ def create_category(request):
 
 @login_required(login_url='/login/')
 def category_list(request):
-    # get role permissions
-    role, permission, permissions_list = get_role_permissions(request.user)
+    permissions_list = request.role_permissions
 
     # superuser হলে সব permission auto add
     if request.user.is_superuser:
@@ -42,9 +58,10 @@ def category_list(request):
             'category_delete',
         ]
 
-    categories = Category.objects.all().order_by('-id')
+    page = keyset_paginate(request, Category.objects.all())
     context = {
-        'categories': categories,
+        'categories': page,
+        'page': page,
         'permissions_list': permissions_list,
     }
     return render(request, 'category/category_list.html', context)
@@ -78,16 +95,8 @@ def delete_category(request, pk):
 
 @login_required(login_url='/login/')
 def product_list(request):
-    products = Product.objects.all().order_by('id')
-    role, permissions, permissions_list = get_role_permissions(request.user)
-
-    context = {
-        'products': products,
-        'role': role,
-        'permissions': permissions,
-        'permissions_list': permissions_list,
-    }
-    return render(request, 'product/product_list.html', context)
+    page = keyset_paginate(request, Product.objects.select_related('category', 'stock'), ordering=('id',))
+    return render(request, 'product/product_list.html', {'products': page, 'page': page})
 
 # ---------------------- Product  Create   ------------------------------
 
@@ -97,7 +106,6 @@ def product_list(request):
 @role_permission_required('product_create')
 def create_product(request):
     products = Product.objects.all().order_by('id')
-    role, permissions, permissions_list = get_role_permissions(request.user)
     if request.method == 'POST':
         form = ProductForm(request.POST)
         if form.is_valid():
@@ -109,9 +117,6 @@ def create_product(request):
     context = {
         'form': form,
         'products': products,
-        'role': role,
-        'permissions': permissions,
-        'permissions_list': permissions_list,   # ✅ add this
     }
     return render(request, 'product/product_form.html', context)
 
@@ -142,6 +147,28 @@ def product_delete(request, pk):
     
     
 
+# ---------------------- Bulk Import  ------------------------------
+
+@login_required(login_url='/login/')
+@admin_required
+def catalog_import(request):
+    form = CatalogImportForm(request.POST or None, request.FILES or None)
+    result = None
+    if form.is_valid():
+        upload = form.cleaned_data['file']
+        lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        result = import_rows(form.cleaned_data['kind'], lines)
+        if result.file_error:
+            messages.error(request, result.file_error)
+        else:
+            messages.success(request, f"Imported {result.created} row(s), {result.failed} row(s) skipped.")
+    return render(request, 'import/import_form.html', {
+        'form': form,
+        'result': result,
+        'errors': result.errors[:200] if result else [],
+    })
+
+
 # ---------------------------------------------------------------------------------------------------------------------------------
 # -------------------------------------------------     Supplier     ---------------------------------------------------------------
 # ---------------------------------------------------------------------------------------------------------------------------------
@@ -149,9 +176,8 @@ def product_delete(request, pk):
 
 @login_required(login_url='/login/')
 def supplier_list(request):
-    suppliers = Supplier.objects.all().order_by('-id')
-    role, permissions, permissions_list = get_role_permissions(request.user)
-    return render(request, 'supplier/supplier_list.html', {'suppliers':suppliers, 'permissions':permissions, 'permissions_list':permissions_list})
+    page = keyset_paginate(request, Supplier.objects.all())
+    return render(request, 'supplier/supplier_list.html', {'suppliers':page, 'page':page})
 
 
 # ---------------------- Supplier Create ------------------------------
@@ -208,29 +234,12 @@ def create_purchase(request):
         if form.is_valid():
             purchase = form.save(commit=False)
             purchase.created_by = request.user
-            purchase.save()
-            products = request.POST.getlist('product')
-            quantities = request.POST.getlist('quantity')
-            prices = request.POST.getlist('purchase_price')
-            product_qty_map = defaultdict(int)
-            for prod_id, qty in zip(products, quantities):
-                if prod_id and qty:
-                    product_qty_map[int(prod_id)] += int(qty)
-            for prod_id, total_qty in product_qty_map.items():
-                price = float(prices[products.index(str(prod_id))])
-                item = PurchaseItem.objects.create(
-                    purchase=purchase, 
-                    product_id=prod_id, 
-                    quantity=total_qty, 
-                    purchase_price=price
-                )
-                if purchase.status == 'Received':
-                    stock, _ = Stock.objects.get_or_create(
-                        product_id=prod_id,
-                        defaults={'quantity': 0}
-                    )
-                    stock.quantity += total_qty
-                    stock.save()
+            lines = collect_purchase_lines(
+                request.POST.getlist('product'),
+                request.POST.getlist('quantity'),
+                request.POST.getlist('purchase_price'),
+            )
+            save_new_purchase(purchase, lines)
 
             return redirect('purchase_detail', pk=purchase.id)
     else:
@@ -242,67 +251,62 @@ def create_purchase(request):
         'products': products
     })
 
+# ----------------------------------------  Purchase Invoice Import  -------------------------------------------
+
+@login_required(login_url='/login/')
+@role_permission_required('purchase_create')
+def purchase_import(request):
+    form = InvoiceImportForm(request.POST or None, request.FILES or None)
+    errors = []
+    if form.is_valid():
+        upload = form.cleaned_data['file']
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        lines, errors = parse_invoice(stream, upload.name)
+        if not errors:
+            purchase = form.save(commit=False)
+            purchase.created_by = request.user
+            save_new_purchase(purchase, lines)
+            messages.success(request, f"Invoice imported with {len(lines)} product(s).")
+            return redirect('purchase_detail', pk=purchase.id)
+    return render(request, 'purchase/purchase_import.html', {'form': form, 'errors': errors[:200]})
+
 # ----------------------------------------  Purchase Update  -------------------------------------------
 
 @login_required(login_url='/login/')
 def purchase_update(request, pk):
-    purchase = get_object_or_404(Purchase, pk=pk)
-    old_status = purchase.status
+    if request.method == 'POST':
+        lines = collect_purchase_lines(
+            request.POST.getlist('product'),
+            request.POST.getlist('quantity'),
+            request.POST.getlist('purchase_price'),
+        )
+        with transaction.atomic():
+            # lock the purchase so concurrent edits apply their stock deltas against the status they replace
+            purchase = get_object_or_404(Purchase.objects.select_for_update(), pk=pk)
+            old_status = purchase.status
+            old_supplier_id = purchase.supplier_id
+            form = PurchaseForm(request.POST, instance=purchase)
+            if form.is_valid():
+                updated_purchase = form.save(commit=False)
+                updated_purchase.created_by = request.user
+                updated_purchase.save()
+                sync_purchase_items(updated_purchase, lines, old_status)
+                refresh_purchase_rollup(updated_purchase, old_supplier_id)
+                return redirect('purchase_list')
+
+    else:
+        purchase = get_object_or_404(Purchase, pk=pk)
+        form = PurchaseForm(instance=purchase)
 
     products = Product.objects.all().order_by('id')
     items = [
         {
-            'product_id': item.product.id,
+            'product_id': item.product_id,
             'quantity': item.quantity,
             'purchase_price': item.purchase_price,
         }
         for item in purchase.items.all()
     ]
-
-    if request.method == 'POST':
-        form = PurchaseForm(request.POST, instance=purchase)
-        if form.is_valid():
-            updated_purchase = form.save(commit=False)
-            updated_purchase.created_by = request.user
-            updated_purchase.save()
-
-            new_status = updated_purchase.status
-
-            if old_status == 'Received':
-                for item in purchase.items.all():
-                    stock = Stock.objects.filter(product=item.product).first()
-                    if stock:
-                        stock.quantity = max(0, stock.quantity - item.quantity)
-                        stock.save()
-
-            purchase.items.all().delete()
-
-            product_ids = request.POST.getlist('product')
-            quantities = request.POST.getlist('quantity')
-            prices = request.POST.getlist('purchase_price')
-
-            for prod_id, qty, price in zip(product_ids, quantities, prices):
-                if prod_id and int(qty) > 0:
-                    item = PurchaseItem.objects.create(
-                        purchase=purchase,
-                        product_id=int(prod_id),
-                        quantity=int(qty),
-                        purchase_price=float(price)
-                    )
-
-                    if new_status == 'Received':
-                        stock, _ = Stock.objects.get_or_create(
-                            product=item.product,
-                            defaults={'quantity': 0}
-                        )
-                        stock.quantity += item.quantity
-                        stock.save()
-
-            return redirect('purchase_list')
-
-    else:
-        form = PurchaseForm(instance=purchase)
-
     return render(request, 'purchase/purchase_form.html', {
         'form': form,
         'products': products,
@@ -315,20 +319,25 @@ def purchase_update(request, pk):
 
 @login_required(login_url='/login/')
 def purchase_list(request):
-    purchases = Purchase.objects.prefetch_related('items__product').order_by('-id')
-    role, permissions, permissions_list = get_role_permissions(request.user)
-    grand_total = 0
-    for p in purchases:
-        try:
-            grand_total += p.total  
-        except Exception as e:
-            print(f"Error calculating total for Purchase {p.id}: {e}")
-            continue
+    purchases = Purchase.objects.select_related('supplier', 'created_by').prefetch_related('items__product')
+    page = keyset_paginate(request, purchases)
+    grand_total = Purchase.objects.aggregate(total=Sum('total_amount'))['total'] or 0
     return render(request, 'purchase/purchase_list.html', {
-        'purchases': purchases,
-        'grand_total': grand_total, 'permissions':permissions, 'permissions_list':permissions_list
+        'purchases': page,
+        'page': page,
+        'grand_total': grand_total
     })
 
+# ----------------------------------------  Purchase  Export  -------------------------------------------
+
+@login_required(login_url='/login/')
+def purchase_export(request):
+    purchases = Purchase.objects.all()
+    stamp = timezone.localdate().isoformat()
+    if request.GET.get('rows') == 'items':
+        return stream_csv(f'purchase-items-{stamp}.csv', PURCHASE_ITEM_HEADER, purchase_item_rows(purchases))
+    return stream_csv(f'purchases-{stamp}.csv', PURCHASE_HEADER, purchase_rows(purchases))
+
 # ----------------------------------------  Purchase  Details  -------------------------------------------
 
 @login_required(login_url='/login/')
@@ -343,13 +352,17 @@ def purchase_detail(request, pk):
 def purchase_delete(request, pk):
     purchases = get_object_or_404(Purchase, pk=pk)
     if request.method == 'POST':
-        for item in purchases.items.all():
-            stock, created= Stock.objects.get_or_create(product=item.product)
-            stock.quantity -= item.quantity
-            if stock.quantity < 0:
-                stock.quantity = 0
-            stock.save()
-        purchases.delete()
+        with transaction.atomic():
+            if purchases.status == 'Received':
+                qty_map = defaultdict(int)
+                for item in purchases.items.all():
+                    qty_map[item.product_id] -= item.quantity
+                record_movements(
+                    'reversal', qty_map, purchase=purchases,
+                    note=f"Purchase #{purchases.id} deleted", floor_at_zero=True
+                )
+            purchases.delete()
+            refresh_purchase_rollup(purchases)
         return redirect('purchase_list')
 
 
@@ -359,8 +372,8 @@ def purchase_delete(request, pk):
 
 @login_required(login_url='/login/')
 def permission_list(request):
-    permissions = Permission.objects.all().order_by('-id')
-    return render(request, 'permission/permission_list.html', {'permissions':permissions})
+    page = keyset_paginate(request, Permission.objects.all())
+    return render(request, 'permission/permission_list.html', {'permissions':page, 'page':page})
 
 
 @login_required(login_url='/login/')
@@ -379,9 +392,8 @@ def permission_create(request):
 
 @login_required(login_url='/login/')
 def role_list(request):
-    roles = Role.objects.all().order_by('-id')
-    role, permissions, permissions_list = get_role_permissions(request.user)
-    return render(request, 'role/role_list.html', {'roles':roles, 'permissions_list':permissions_list, 'permissions':permissions})
+    page = keyset_paginate(request, Role.objects.prefetch_related('permissions'))
+    return render(request, 'role/role_list.html', {'roles':page, 'page':page})
 
 
 @login_required(login_url='/login/')
@@ -423,9 +435,8 @@ def role_delete(request, pk):
 @login_required(login_url='/login/')
 
 def user_list(request):
-    role, permissions, permission_list = get_role_permissions(request.user)
-    users = User.objects.all().order_by('-id')
-    return render(request, 'user/user_list.html', {'users': users, 'permissions_list': permission_list, 'permissions':permissions, 'role':role})
+    page = keyset_paginate(request, User.objects.select_related('userprofile__role'))
+    return render(request, 'user/user_list.html', {'users': page, 'page': page})
 
 login_required(login_url='/login/')
 @role_permission_required('user_create')
@@ -513,13 +524,12 @@ def delete_user(request, id):
 # ===============================================================================================
 @login_required(login_url='/login/')
 def system_list(request):
-    settings_instance = SystemSettings.objects.first()
-    return render(request, 'system/system_list.html', {'settings': settings_instance})
+    return render(request, 'system/system_list.html', {'settings': get_system_settings()})
 
 # Create new system settings
 @login_required(login_url='/login/')
 def company_create(request):
-    if SystemSettings.objects.exists():
+    if get_system_settings() is not None:
         return redirect('system_list')
     if request.method == "POST":
         form = SystemSettingsForm(request.POST, request.FILES)
@@ -529,6 +539,8 @@ def company_create(request):
                 instance.logo.delete(save=False)
                 instance.logo = None
             instance.save()
+            if request.POST.get('delete_logo') or 'logo' in form.changed_data:
+                refresh_logo_variants(instance)
             return redirect('system_list')
     else:
         form = SystemSettingsForm()
@@ -549,6 +561,8 @@ def system_update(request, pk):
                 instance.logo.delete(save=False)
                 instance.logo = None
             instance.save()
+            if request.POST.get('delete_logo') or 'logo' in form.changed_data:
+                refresh_logo_variants(instance)
             return redirect('system_list')
     else:
         form = SystemSettingsForm(instance=settings_instance)
@@ -556,14 +570,24 @@ def system_update(request, pk):
     print(form.errors) 
     return render(request, 'system/system.html', {'form': form, 'title': 'Update System Settings'})
 
+# Logo variants have content-hashed names, so they can be cached forever
+def logo_variant(request, filename):
+    path = variant_path(filename)
+    if path is None or not default_storage.exists(path):
+        raise Http404("Unknown logo variant")
+    response = FileResponse(default_storage.open(path, 'rb'), content_type='image/png')
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
 # ===============================================================================================
 # ------------------------------------------   low stock ----------------------------------
 # ===============================================================================================
 
 def low_stock_list(request):
-    products = Product.objects.filter(stock__quantity__lt=8).order_by('id')
-    role, permissions, permissions_list = get_role_permissions(request.user)
-    context = {'products': products, 'role': role, 'permissions': permissions, 'permissions_list': permissions_list}
+    products = list(low_stock_products().select_related('category', 'stock').order_by('id'))
+    for product in products:
+        product.suggested_quantity = suggested_order_quantity(product.stock)
+    context = {'products': products}
     return render(request, 'low_stock/stock_list.html', context)
 
 
@@ -571,6 +595,30 @@ def low_stock_list(request):
 # ------------------------------------       Collecting Orders      -----------------------------
 # ===============================================================================================
 
+# ETags for the order-taking pages: catalog and settings versions + who is looking (user, role
+# and its permission version, csrf secret).
+# Pages with pending flash messages are never answered with 304.
+def order_page_etag(request, category_id=None):
+    if len(messages.get_messages(request)):
+        return None
+    role = get_user_role(request.user)
+    raw = ':'.join(str(part) for part in (
+        catalog_version(),
+        system_settings_version(),
+        category_id,
+        request.user.pk,
+        getattr(role, 'pk', None),
+        getattr(role, 'version', None),
+        request.META.get('CSRF_COOKIE', ''),
+    ))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def catalog_json_etag(request, category_id):
+    return f'catalog-{catalog_version()}-{category_id}'
+
+
+@condition(etag_func=order_page_etag)
 def order_list(request, category_id = None):
     categories = Category.objects.all()
     if category_id:
@@ -584,6 +632,7 @@ def order_list(request, category_id = None):
 
 # -------------------------------------------------------------------------------------------------------
 
+@condition(etag_func=order_page_etag)
 def collect_order_list(request, category_id=None):
     categories = Category.objects.all()
     if category_id:
@@ -598,76 +647,55 @@ def collect_order_list(request, category_id=None):
 
 
 # --------------------------  JsonResponse  --------------------------------
+@condition(etag_func=catalog_json_etag)
 def ajax_products_by_category(request, category_id):
-    if category_id == 'all':
-        products = Product.objects.filter(stock__isnull=False, stock__quantity__gt=0)
-    else:
-        products = Product.objects.filter(category_id=category_id, stock__isnull=False, stock__quantity__gt=0)
-    data = []
-    for p in products:
-        data.append({
-            'id': p.id,
-            'name': p.name,
-            'price': float(p.price),
-            'stock': p.stock.quantity
-        })
-    return JsonResponse(data, safe=False)
+    if category_id != 'all' and not category_id.isdigit():
+        raise Http404("Unknown category")
+    return HttpResponse(category_products_json(category_id), content_type='application/json')
+
+
+# --------------------------  Catalog changes feed  --------------------------------
+def catalog_changes(request):
+    try:
+        since = int(request.GET.get('since', 0))
+    except ValueError:
+        return JsonResponse({'error': 'since must be an integer'}, status=400)
+    return JsonResponse(catalog_changes_since(since))
 
 # ===============================================================================================
 # ------------------------------------       pending order view      -----------------------------
 # ===============================================================================================
 
+def _submit_pending_order(request):
+    # shared by create_order and save_order: stock, ledger and the table check all go through place_order
+    items = json.loads(request.POST.get('order_items') or '[]')
+    try:
+        with transaction.atomic():
+            order = place_order(
+                items,
+                table=request.POST.get('table'),
+                order_type=request.POST.get('order_type'),
+                discount=request.POST.get('discount') or 0,
+                grand_total=request.POST.get('grand_total') or 0,
+                paid_amount=request.POST.get('paid_amount') or 0,
+                fund=request.POST.get('fund'),
+                status='pending'
+            )
+            # alert delivery runs in the run_tasks worker, queued with the order that raised alerts
+            if order.low_stock_alerts:
+                enqueue(deliver_low_stock_alerts)
+    except OrderRejected as e:
+        messages.error(request, str(e))
+        return redirect('create_order')
+
+    messages.success(request, "Order created successfully!")
+    return redirect('pending_orders')
+
+
+@condition(etag_func=order_page_etag)
 def create_order(request):
     if request.method == 'POST':
-        table = request.POST.get('table')
-        order_type = request.POST.get('order_type')
-        discount = request.POST.get('discount') or 0
-        grand_total = request.POST.get('grand_total') or 0
-        paid_amount = request.POST.get('paid_amount') or 0
-        fund = request.POST.get('fund')
-
-        #  check pending order by table
-        if Order.objects.filter(table=table, status='pending').exists():
-            messages.error(request, f"Table {table} already has a pending order!")
-            return redirect('create_order')
-
-        order = Order.objects.create(
-            table=table,
-            order_type=order_type,
-            discount=discount,
-            grand_total=grand_total,
-            paid_amount=paid_amount,
-            fund=fund,
-            status='pending'
-        )
-
-        items = json.loads(request.POST.get('order_items', '[]'))
-        
-        for item in items:
-            product = Product.objects.get(id=item['product_id'])
-            quantity = int(item['quantity'])
-            price = float(item['price'])
-            amount = quantity * price
-
-            # Stock check
-            if product.stock.quantity < quantity:
-                messages.error(request, f"{product.name} not available.")
-                order.delete() 
-                return redirect('create_order')
-            # OrderItem create
-            OrderItem.objects.create(
-                order=order,
-                product_name=product.name,
-                quantity=quantity,
-                price=price,
-                amount=amount
-            )
-            # Stock update
-            product.stock.quantity -= quantity
-            product.stock.save()
-            
-        messages.success(request, "Order created successfully!")
-        return redirect('pending_orders')
+        return _submit_pending_order(request)
 
     # ✅ IMPORTANT: GET request handle
     categories = Category.objects.all()
@@ -681,29 +709,8 @@ def create_order(request):
 
 def save_order(request):
     if request.method == 'POST':
-        table = request.POST.get('table')
-        order_type = request.POST.get('order_type')
-        discount = float(request.POST.get('discount', 0))
-        grand_total = float(request.POST.get('grand_total', 0))
-        fund = request.POST.get('fund')
-        paid_amount = float(request.POST.get('paid_amount', 0))
-        order_items_json = request.POST.get('order_items')
-        order_items = json.loads(order_items_json)
-        # Create Order
-        order = Order.objects.create(
-            table=table,
-            order_type=order_type,
-            discount=discount,
-            grand_total=grand_total,
-            fund=fund,
-            paid_amount=paid_amount,
-            status='pending'
-        )
-        # Create OrderItems
-        for item in order_items:
-            OrderItem.objects.create(order=order, product_id=item['product_id'], quantity=item['quantity'], price=item['price'], amount=item['quantity']*item['price'])
-
-        return redirect('pending_orders')
+        return _submit_pending_order(request)
+    return redirect('create_order')
 
 # ==============================================================================================
 
@@ -711,7 +718,7 @@ def pending_order_list(request):
     orders = Order.objects.filter(status='pending') \
         .prefetch_related('items') \
         .order_by('-id')
-    settings = SystemSettings.objects.first()
+    settings = get_system_settings()
     return render(request, 'collect_order/pending_order.html', {
         'orders': orders,
         'settings': settings,
@@ -720,8 +727,12 @@ def pending_order_list(request):
 
 def accept_order(request, order_id):
     order = Order.objects.get(id=order_id, status='pending')
-    order.status = 'completed'
-    order.save()
+    with transaction.atomic():
+        # only the request that actually flips the status counts the sale
+        if Order.objects.filter(pk=order.pk, status='pending').update(status='completed'):
+            order.status = 'completed'
+            # stays in the request: the dashboard version is bumped once the rollup row is committed
+            add_order_to_daily_sales(order)
     messages.success(request, f"Order accepted successfully!")
     return redirect('pending_orders')  # redirect to sales report
 
@@ -729,44 +740,64 @@ def accept_order(request, order_id):
 # =========================================  Sales Report ======================================
 
 def sales_report_list(request):
-    orders = Order.objects.filter(status='completed').order_by('-created_at')
-    total_grand = orders.aggregate(total=Sum('grand_total'))['total'] or 0
+    form, orders = filtered_sales(request.GET)
+    page = keyset_paginate(request, orders, ordering=('-created_at', '-id'))
+    daily_totals, fund_totals = sales_breakdown(form, orders)
+    total_grand = sum(row['total'] or 0 for row in fund_totals)
+    # form.data carries the defaulted start date, so exports and pages cover the same range
+    filter_params = form.data.copy()
+    filter_params.pop('after', None)
+    filter_params.pop('before', None)
     return render(request, 'report/sales_list.html', {
-        'orders': orders,
-        'total_grand': total_grand
+        'form': form,
+        'orders': page,
+        'page': page,
+        'total_grand': total_grand,
+        'daily_totals': daily_totals,
+        'fund_totals': fund_totals,
+        'filter_query': filter_params.urlencode(),
+    })
+    
+    
+@login_required(login_url='/login/')
+def sales_report_export(request):
+    form, orders = filtered_sales(request.GET)
+    stamp = timezone.localdate().isoformat()
+    if request.GET.get('rows') == 'items':
+        return stream_csv(f'sales-items-{stamp}.csv', ORDER_ITEM_HEADER, order_item_rows(orders))
+    return stream_csv(f'sales-{stamp}.csv', ORDER_HEADER, order_rows(orders))
+    
+    
+# =========================================  Top Sellers ======================================
+
+def _velocity_window(request):
+    window = request.GET.get('window', '7')
+    return window if window in VELOCITY_WINDOWS else '7'
+
+
+@login_required(login_url='/login/')
+def top_sellers_report(request):
+    report = velocity_report(_velocity_window(request))
+    return render(request, 'report/top_sellers.html', {
+        'report': report,
+        'windows': VELOCITY_WINDOWS,
     })
+
+
+@login_required(login_url='/login/')
+def top_sellers_json(request):
+    return JsonResponse(velocity_report(_velocity_window(request)))
     
     
 # =========================================  Admin Dashboard ======================================
 def admin_dashboard(request):
-    purchases = Purchase.objects.prefetch_related('items__product')
-    total_purchase = Decimal(sum([p.total for p in purchases]))
-    total_sales = Decimal(
-        Order.objects.filter(status='completed').aggregate(total=Sum('grand_total'))['total'] or 0
-    )
-    profit = total_sales - total_purchase
-
-    monthly_totals = defaultdict(Decimal)
-    for p in purchases:
-        month = p.purchase_date.strftime('%Y-%m')  
-        monthly_totals[month] += p.total
-
-    purchase_chart = [{'month': k, 'total': float(v)} for k, v in sorted(monthly_totals.items())]
-
-    sales_chart = (
-        Order.objects.filter(status='completed')
-        .annotate(month=TruncMonth('created_at'))
-        .values('month')
-        .annotate(total=Sum('grand_total'))
-        .order_by('month')
-    )
-
+    payload = dashboard_payload()
     return render(request, 'dashboard/admin_dashboard.html', {
-        'total_purchase': total_purchase,
-        'total_sales': total_sales,
-        'profit': profit,
-        'purchase_chart': purchase_chart,
-        'sales_chart': sales_chart,
+        'total_purchase': payload['total_purchase'],
+        'total_sales': payload['total_sales'],
+        'profit': payload['profit'],
+        'purchase_chart': payload['purchase_chart'],
+        'sales_chart': payload['sales_chart'],
     })
     
     
@@ -784,9 +815,3 @@ def admin_dashboard(request):
 #         'purchases': purchases,
 #         'grand_total': grand_total, 'permissions':permissions, 'permissions_list':permissions_list
 #     })
-
-
-
-@receiver(post_save, sender=PurchaseItem)
-def update_purchase_total(sender, instance, **kwargs):
-    instance.purchase.update_total_amount()
\ No newline at end of file